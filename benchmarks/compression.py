@@ -0,0 +1,66 @@
+"""
+Measure the bytes on the wire and the CPU cost of compressing feed pages of the seeded database.
+
+Every page is encoded like /api/post/all does, then compressed with each coding the
+CompressionMiddleware can use. CPU time is process time, so it is what a worker
+spends per response. Brotli levels are skipped when the `brotli` package is missing.
+
+    python -m benchmarks.compression --page-sizes 50 200 --repeat 50
+"""
+import argparse
+import asyncio
+import json
+import time
+
+import orjson
+
+from src.database.database import async_session_maker
+from src.middleware.compression import BrotliEncoder, GzipEncoder, brotli
+from src.posts.repository import PostQuery
+
+ENCODERS = {
+    "gzip-1": lambda: GzipEncoder(1),
+    "gzip-6": lambda: GzipEncoder(6),
+    "gzip-9": lambda: GzipEncoder(9),
+}
+if brotli is not None:
+    ENCODERS.update({
+        "br-1": lambda: BrotliEncoder(1),
+        "br-4": lambda: BrotliEncoder(4),
+        "br-11": lambda: BrotliEncoder(11),
+    })
+
+
+def measure(body: bytes, repeat: int) -> dict:
+    report = {"identity": {"bytes": len(body), "ratio": 1.0, "cpu_ms": 0.0}}
+    for name, make_encoder in ENCODERS.items():
+        compressed = b""
+        started = time.process_time()
+        for _ in range(repeat):
+            encoder = make_encoder()
+            compressed = encoder.compress(body) + encoder.finish()
+        cpu = time.process_time() - started
+        report[name] = {
+            "bytes": len(compressed),
+            "ratio": round(len(compressed) / len(body), 3) if body else 0.0,
+            "cpu_ms": round(cpu / repeat * 1000, 3),
+        }
+    return report
+
+
+async def run(page_sizes: list[int], repeat: int) -> dict:
+    report = {}
+    async with async_session_maker() as session:
+        for page_size in page_sizes:
+            rows, _ = await PostQuery.read_page(session, limit=page_size)
+            body = orjson.dumps([row._asdict() for row in rows])
+            report[str(page_size)] = measure(body, repeat)
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark feed response compression.")
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[50, 200])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.page_sizes, args.repeat)), indent=2))
@@ -0,0 +1,156 @@
+"""
+Run the HTTP benchmark scenarios against the ASGI app of main.py in-process.
+
+Requests go through httpx.AsyncClient with an ASGI transport, so the numbers
+cover routing, dependencies, serialization and the database, but no network.
+Seed the database with benchmarks.seed first. Results are printed, or written
+with --output, as JSON with latency percentiles and queries per request.
+
+    python -m benchmarks.run --requests 1000 --concurrency 32 --output bench.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from collections import Counter
+from datetime import datetime
+
+import httpx
+from sqlalchemy import event, select
+
+from benchmarks.scenarios import SCENARIOS, BenchContext
+from benchmarks.seed import BENCH_PASSWORD, bench_email
+from main import app
+from src.database.database import async_session_maker, engine
+from src.database.models import Post
+
+
+class QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args, **kwargs):
+        self.count += 1
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, round(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def login(client: httpx.AsyncClient, index: int) -> str:
+    response = await client.post("/auth/jwt/login", data={"username": bench_email(index), "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def run_scenario(ctx: BenchContext, name: str, requests: int, concurrency: int, warmup: int,
+                       queries: QueryCounter) -> dict:
+    """
+    Run one scenario `requests` times with `concurrency` concurrent workers.
+
+    :return: dict: Latency percentiles in milliseconds, throughput, status codes and queries per request.
+    """
+    fn = SCENARIOS[name]
+    for _ in range(warmup):
+        await fn(ctx)
+
+    latencies, statuses, failures = [], Counter(), 0
+    pending = iter(range(requests))
+
+    async def worker():
+        nonlocal failures
+        for _ in pending:
+            started = time.perf_counter()
+            try:
+                response = await fn(ctx)
+            except httpx.HTTPError:
+                failures += 1
+                continue
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] += 1
+
+    queries_before = queries.count
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    executed = queries.count - queries_before
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        "queries_per_request": round(executed / len(latencies), 3) if latencies else 0.0,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "failures": failures,
+    }
+
+
+async def run(args) -> dict:
+    queries = QueryCounter()
+    event.listen(engine.sync_engine, "before_cursor_execute", queries)
+    rng = random.Random(args.random_seed)
+
+    async with app.router.lifespan_context(app):
+        async with async_session_maker() as session:
+            post_ids = list((await session.scalars(select(Post.id).limit(args.sample_posts))).all())
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            tokens = [await login(client, index) for index in range(args.users)]
+            ctx = BenchContext(client=client, tokens=tokens, post_ids=post_ids, rng=rng)
+            results = {}
+            for name in args.scenarios:
+                results[name] = await run_scenario(ctx, name, args.requests, args.concurrency, args.warmup, queries)
+
+    event.remove(engine.sync_engine, "before_cursor_execute", queries)
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "users": args.users,
+        },
+        "scenarios": results,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the API hot paths in-process.")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500, help="Timed requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed requests per scenario")
+    parser.add_argument("--users", type=int, default=20, help="Number of seeded users to log in")
+    parser.add_argument("--sample-posts", type=int, default=5_000, help="Number of post IDs requests pick from")
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(report)
+    else:
+        print(report)
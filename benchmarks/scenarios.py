@@ -0,0 +1,126 @@
+"""
+Benchmark scenarios. Each scenario sends one request through the in-process client
+and returns its response; register new ones with the @scenario decorator.
+"""
+import asyncio
+import random
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+
+import httpx
+
+from benchmarks.seed import BENCH_PASSWORD, SEARCH_TOPICS, bench_email
+
+SCENARIOS = {}
+
+
+@dataclass
+class BenchContext:
+    client: httpx.AsyncClient
+    tokens: list[str]
+    post_ids: list[int]
+    rng: random.Random
+    liked: list[tuple[str, int]] = field(default_factory=list)
+    etags: dict[int, str] = field(default_factory=dict)
+
+    def auth(self, token: str | None = None) -> dict:
+        return {"Authorization": f"Bearer {token or self.rng.choice(self.tokens)}"}
+
+
+def scenario(name: str):
+    def register(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return register
+
+
+@scenario("get_all_posts")
+async def get_all_posts(ctx: BenchContext) -> httpx.Response:
+    return await ctx.client.get("/api/post/all")
+
+
+@scenario("get_post")
+async def get_post(ctx: BenchContext) -> httpx.Response:
+    return await ctx.client.get(f"/api/post/{ctx.rng.choice(ctx.post_ids)}", headers=ctx.auth())
+
+
+@scenario("get_post_conditional")
+async def get_post_conditional(ctx: BenchContext) -> httpx.Response:
+    # Polling client: revalidates its copy with If-None-Match, mostly answered with 304.
+    post_id = ctx.rng.choice(ctx.post_ids)
+    headers = ctx.auth()
+    if post_id in ctx.etags:
+        headers["If-None-Match"] = ctx.etags[post_id]
+    response = await ctx.client.get(f"/api/post/{post_id}", headers=headers)
+    if "ETag" in response.headers:
+        ctx.etags[post_id] = response.headers["ETag"]
+    return response
+
+
+@scenario("like_post")
+async def like_post(ctx: BenchContext) -> httpx.Response:
+    token, post_id = ctx.rng.choice(ctx.tokens), ctx.rng.choice(ctx.post_ids)
+    response = await ctx.client.post(f"/api/post/{post_id}/like", headers=ctx.auth(token))
+    if response.status_code == 200:
+        ctx.liked.append((token, post_id))
+    return response
+
+
+@scenario("unlike_post")
+async def unlike_post(ctx: BenchContext) -> httpx.Response:
+    # Undoes likes made by like_post first, so a full run leaves the dataset unchanged.
+    token, post_id = ctx.liked.pop() if ctx.liked else (ctx.rng.choice(ctx.tokens), ctx.rng.choice(ctx.post_ids))
+    return await ctx.client.post(f"/api/post/{post_id}/unlike", headers=ctx.auth(token))
+
+
+@scenario("search_posts")
+async def search_posts(ctx: BenchContext) -> httpx.Response:
+    return await ctx.client.get("/api/post/search", params={"q": ctx.rng.choice(SEARCH_TOPICS), "limit": 50})
+
+
+@scenario("search_posts_client_side")
+async def search_posts_client_side(ctx: BenchContext) -> httpx.Response:
+    # What clients do without /search: page through /all and filter locally until a page of matches is found.
+    topic, matches, params = ctx.rng.choice(SEARCH_TOPICS), 0, {"limit": 200}
+    while True:
+        response = await ctx.client.get("/api/post/all", params=params)
+        matches += sum(topic in (post["text"] or "").lower() for post in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if matches >= 50 or cursor is None:
+            return response
+        params["cursor"] = cursor
+
+
+@scenario("get_trending_posts")
+async def get_trending_posts(ctx: BenchContext) -> httpx.Response:
+    return await ctx.client.get("/api/post/trending", params={"limit": 20})
+
+
+@scenario("get_analytics_by_days")
+async def get_analytics_by_days(ctx: BenchContext) -> httpx.Response:
+    date_to = date.today()
+    date_from = date_to - timedelta(days=30)
+    return await ctx.client.get(
+        "/api/post/analytics/",
+        params={"date_from": date_from.isoformat(), "date_to": date_to.isoformat()},
+        headers=ctx.auth(),
+    )
+
+
+@scenario("login")
+async def login(ctx: BenchContext) -> httpx.Response:
+    # Seeded users are logged in in order, so any index below len(tokens) exists.
+    data = {"username": bench_email(ctx.rng.randrange(len(ctx.tokens))), "password": BENCH_PASSWORD}
+    return await ctx.client.post("/auth/jwt/login", data=data)
+
+
+@scenario("get_post_during_logins")
+async def get_post_during_logins(ctx: BenchContext) -> httpx.Response:
+    # Latency of a cheap read while a login hashes a password: it stalls if hashing blocks the event loop.
+    _, response = await asyncio.gather(login(ctx), get_post(ctx))
+    return response
+
+
+@scenario("current_active_user")
+async def current_active_user(ctx: BenchContext) -> httpx.Response:
+    return await ctx.client.get("/authenticated-route", headers=ctx.auth())
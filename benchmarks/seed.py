@@ -0,0 +1,179 @@
+"""
+Seed a reproducible benchmark dataset into the database configured in .env.
+
+The schema must already be migrated (`alembic upgrade head`). Every seeded user
+has the password BENCH_PASSWORD and the email bench<N>@example.com. Likes follow
+a Zipf-like distribution over posts, controlled by --like-skew.
+
+    python -m benchmarks.seed --reset --users 1000 --posts-per-user 20 --likes-per-user 50
+"""
+import argparse
+import asyncio
+import random
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi_users.password import PasswordHelper
+from sqlalchemy import insert, text
+
+from src.config import settings
+from src.database.database import async_session_maker, engine
+from src.database.models import User, Post, association_table, like_keys_table
+from src.database.partitions import ensure_like_partitions
+from src.posts.repository import PostQuery
+
+BENCH_PASSWORD = "bench-password"
+# Every post mentions one topic, so search benchmarks have matches of a known selectivity.
+SEARCH_TOPICS = ("python", "postgres", "coffee", "hiking", "music", "travel", "football", "cooking")
+CHUNK_SIZE = 5_000
+
+
+def bench_email(index: int) -> str:
+    return f"bench{index}@example.com"
+
+
+def chunks(rows: list, size: int = CHUNK_SIZE):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+async def seed(users: int, posts_per_user: int, likes_per_user: int, like_skew: float, days: int,
+               random_seed: int, reset: bool) -> dict:
+    """
+    Insert users, posts and skewed likes, then rebuild the denormalized counters.
+
+    :param users: int: The number of users to create.
+    :param posts_per_user: int: The number of posts created by every user.
+    :param likes_per_user: int: The number of distinct posts liked by every user.
+    :param like_skew: float: The Zipf exponent of post popularity, 0 for uniform likes.
+    :param days: int: The number of past days the posts and likes are spread over.
+    :param random_seed: int: The seed making the dataset reproducible.
+    :param reset: bool: Whether to wipe users, posts and likes before seeding.
+    :return: dict: The dataset description.
+    """
+    rng = random.Random(random_seed)
+    now = datetime.now()
+    hashed_password = PasswordHelper().hash(BENCH_PASSWORD)
+
+    async with async_session_maker() as session:
+        if reset:
+            await session.execute(text('TRUNCATE "user", posts, user_post_likes, user_likes, like_daily_stats CASCADE'))
+        # Likes are spread over the past days, whose monthly partitions may not exist yet.
+        await ensure_like_partitions(session, settings.likes_partitions_ahead, start=(now - timedelta(days=days)).date())
+
+        user_ids = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(users)]
+        user_rows = [
+            {
+                "id": user_id,
+                "email": bench_email(index),
+                "hashed_password": hashed_password,
+                "is_active": True,
+                "is_superuser": False,
+                "is_verified": True,
+                "username": f"bench{index}",
+                "created_at": now - timedelta(days=days),
+            }
+            for index, user_id in enumerate(user_ids)
+        ]
+        for batch in chunks(user_rows):
+            await session.execute(insert(User), batch)
+
+        post_rows = [
+            {
+                "owner_id": user_id,
+                "text": f"Benchmark post {number} of {user_id} about {rng.choice(SEARCH_TOPICS)}",
+                "created_at": now - timedelta(seconds=rng.randrange(days * 86_400)),
+            }
+            for user_id in user_ids
+            for number in range(posts_per_user)
+        ]
+        post_ids = []
+        for batch in chunks(post_rows):
+            result = await session.execute(insert(Post).values(batch).returning(Post.id))
+            post_ids.extend(result.scalars().all())
+
+        weights = [1 / (rank + 1) ** like_skew for rank in range(len(post_ids))]
+        like_rows = []
+        for user_id in user_ids:
+            liked = set(rng.choices(post_ids, weights, k=likes_per_user)) if post_ids else set()
+            like_rows.extend(
+                {
+                    "user_id": user_id,
+                    "post_id": post_id,
+                    "created_at": now - timedelta(seconds=rng.randrange(days * 86_400)),
+                }
+                for post_id in liked
+            )
+        for batch in chunks(like_rows):
+            await session.execute(insert(like_keys_table), batch)
+            await session.execute(insert(association_table), batch)
+
+        await session.execute(text(
+            """
+            UPDATE posts
+            SET like_count = coalesce(likes.total, 0)
+            FROM posts AS p
+            LEFT JOIN (SELECT post_id, count(*) AS total FROM user_post_likes GROUP BY post_id) AS likes
+                ON likes.post_id = p.id
+            WHERE posts.id = p.id
+            """
+        ))
+        await session.execute(text(
+            """
+            INSERT INTO post_scores (post_id, hot_rank)
+            SELECT post_id,
+                   CAST(:now_units AS float8) + ln(greatest(
+                       sum(power(0.5, extract(epoch FROM CAST(:now AS timestamp) - created_at) / CAST(:half_life AS float8))),
+                       1e-300
+                   )) / ln(2)
+            FROM user_post_likes
+            GROUP BY post_id
+            ON CONFLICT (post_id) DO UPDATE SET hot_rank = excluded.hot_rank
+            """
+        ), {
+            "now": now,
+            "now_units": PostQuery.trending_units(now),
+            "half_life": settings.trending_half_life_seconds,
+        })
+        await session.execute(text("DELETE FROM like_daily_stats"))
+        await session.execute(text(
+            """
+            INSERT INTO like_daily_stats (day, like_count)
+            SELECT date(created_at), count(*)
+            FROM user_post_likes
+            WHERE created_at IS NOT NULL
+            GROUP BY date(created_at)
+            """
+        ))
+        await session.commit()
+
+    async with engine.connect() as connection:
+        await connection.execution_options(isolation_level="AUTOCOMMIT")
+        await connection.execute(text("ANALYZE"))
+
+    return {
+        "users": users,
+        "posts": len(post_ids),
+        "likes": len(like_rows),
+        "like_skew": like_skew,
+        "days": days,
+        "random_seed": random_seed,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a benchmark dataset.")
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--posts-per-user", type=int, default=20)
+    parser.add_argument("--likes-per-user", type=int, default=50)
+    parser.add_argument("--like-skew", type=float, default=1.1)
+    parser.add_argument("--days", type=int, default=60)
+    parser.add_argument("--random-seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="Wipe users, posts and likes first")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print(asyncio.run(seed(args.users, args.posts_per_user, args.likes_per_user, args.like_skew, args.days,
+                           args.random_seed, args.reset)))
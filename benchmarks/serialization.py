@@ -0,0 +1,78 @@
+"""
+Compare the two response pipelines of the /api/post/all feed on the seeded database.
+
+- orm_pydantic: select(Post) ORM entities, validated by pydantic and encoded with
+  json.dumps, as FastAPI does for a response_model with the default JSONResponse.
+- rows_orjson: select(*POST_COLUMNS) plain rows encoded with orjson, as the feed does now.
+
+    python -m benchmarks.serialization --page-sizes 50 200 1000 --repeat 50
+"""
+import argparse
+import asyncio
+import json
+import time
+from typing import List
+
+import orjson
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from src.database.database import async_session_maker
+from src.database.models import Post
+from src.posts.repository import POST_COLUMNS
+from src.posts.schemas import PostSchemaResponse
+
+posts_adapter = TypeAdapter(List[PostSchemaResponse])
+
+
+def encode_orm_pydantic(posts) -> bytes:
+    validated = posts_adapter.validate_python(posts, from_attributes=True)
+    content = posts_adapter.dump_python(validated, mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+
+def encode_rows_orjson(rows) -> bytes:
+    return orjson.dumps([row._asdict() for row in rows])
+
+
+async def measure(page_size: int, repeat: int) -> dict:
+    order = (Post.created_at.desc(), Post.id.desc())
+    pipelines = {
+        "orm_pydantic": (select(Post).order_by(*order).limit(page_size), lambda result: result.scalars().all(),
+                         encode_orm_pydantic),
+        "rows_orjson": (select(*POST_COLUMNS).order_by(*order).limit(page_size), lambda result: result.all(),
+                        encode_rows_orjson),
+    }
+    report = {}
+    async with async_session_maker() as session:
+        for name, (stmt, fetch, encode) in pipelines.items():
+            load_time = encode_time = 0.0
+            body = b""
+            for _ in range(repeat):
+                session.expunge_all()
+                started = time.perf_counter()
+                items = fetch(await session.execute(stmt))
+                loaded = time.perf_counter()
+                body = encode(items)
+                load_time += loaded - started
+                encode_time += time.perf_counter() - loaded
+            report[name] = {
+                "load_ms": round(load_time / repeat * 1000, 3),
+                "encode_ms": round(encode_time / repeat * 1000, 3),
+                "total_ms": round((load_time + encode_time) / repeat * 1000, 3),
+                "bytes": len(body),
+            }
+    report["speedup"] = round(report["orm_pydantic"]["total_ms"] / report["rows_orjson"]["total_ms"], 2)
+    return report
+
+
+async def run(page_sizes: list[int], repeat: int) -> dict:
+    return {str(page_size): await measure(page_size, repeat) for page_size in page_sizes}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark feed serialization pipelines.")
+    parser.add_argument("--page-sizes", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.page_sizes, args.repeat)), indent=2))
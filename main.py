@@ -1,17 +1,79 @@
+import asyncio
+from contextlib import asynccontextmanager
 from datetime import datetime
 
 import uvicorn
 from fastapi import FastAPI, Depends
-from src.users.users import auth_backend, fastapi_users, current_active_user
+from fastapi.responses import ORJSONResponse
+from src.config import settings
+from src.database.database import dispose_engines, warm_up_pool
+from src.database.partitions import run_partition_maintenance
+from src.users.activity import ActivityMiddleware, activity_tracker
+from src.users.users import auth_backend, fastapi_users, current_active_user, get_jwt_strategy
 from src.users.schemas import UserRead, UserCreate
+from src.users.router import users_router
 from src.database.models import User
+from src.posts.like_queue import like_queue
 from src.posts.router import posts_router
+from src.middleware.admission import ADMISSION_RULES, AdmissionMiddleware, admission_controller
+from src.middleware.cache_control import CacheControlMiddleware
+from src.middleware.compression import CompressionMiddleware
+from src.monitoring.instrumentation import QueryStatsMiddleware
+from src.monitoring.router import monitoring_router, metrics_router
 
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.db_pool_warmup:
+        await warm_up_pool(settings.db_pool_size)
+    background_tasks = [asyncio.create_task(run_partition_maintenance(settings.likes_partition_maintenance_interval))]
+    if settings.like_write_behind:
+        background_tasks.append(asyncio.create_task(like_queue.run()))
+    if settings.activity_tracking:
+        background_tasks.append(asyncio.create_task(activity_tracker.run(settings.activity_flush_interval)))
+    yield
+    for task in background_tasks:
+        task.cancel()
+    # Errors are logged by the tasks themselves, the engines must be disposed anyway.
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await dispose_engines()
 
 
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+if settings.activity_tracking:
+    app.add_middleware(ActivityMiddleware, strategy=get_jwt_strategy())
+# Public policies let a shared cache serve a response to anyone, so they are only for routes readable anonymously.
+app.add_middleware(
+    CacheControlMiddleware,
+    policies={
+        "/api/post/all": f"public, max-age={settings.cache_feed_max_age}",
+        "/api/post/trending": f"public, max-age={settings.cache_feed_max_age}",
+        "/api/post/search": f"public, max-age={settings.cache_feed_max_age}",
+        "/api/post/{post_id}": f"public, max-age={settings.cache_post_max_age}",
+    },
+)
+if settings.compression_enabled:
+    app.add_middleware(
+        CompressionMiddleware,
+        min_size=settings.compression_min_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+        media_types=settings.compression_media_types,
+    )
+app.add_middleware(QueryStatsMiddleware)
+if settings.admission_enabled:
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=admission_controller,
+        rules=ADMISSION_RULES,
+        retry_after=settings.admission_retry_after,
+    )
+
 app.include_router(posts_router, prefix="/api")
+app.include_router(users_router, prefix="/api")
+app.include_router(monitoring_router, prefix="/api")
+app.include_router(metrics_router)
 
 app.include_router(
     fastapi_users.get_auth_router(auth_backend), prefix="/auth/jwt", tags=["auth"]
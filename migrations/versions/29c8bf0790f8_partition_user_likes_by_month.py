@@ -0,0 +1,110 @@
+"""Partition user_likes by month of created_at, keep the current likes in user_post_likes
+
+Revision ID: 29c8bf0790f8
+Revises: 9f01ccee696d
+Create Date: 2026-10-18 23:12:08.417305
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '29c8bf0790f8'
+down_revision: Union[str, None] = '9f01ccee696d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match the likes_partitions_ahead default, later months are created by the maintenance job.
+PARTITIONS_AHEAD = 3
+
+
+def upgrade() -> None:
+    op.drop_index('ix_user_likes_created_at', table_name='user_likes')
+    op.drop_index('ux_user_likes_user_id_post_id', table_name='user_likes')
+    op.rename_table('user_likes', 'user_likes_legacy')
+
+    op.create_table('user_post_likes',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'post_id')
+    )
+    op.create_index('ix_user_post_likes_post_id', 'user_post_likes', ['post_id'], unique=False)
+    op.execute(
+        """
+        INSERT INTO user_post_likes (user_id, post_id, created_at)
+        SELECT user_id, post_id, created_at FROM user_likes_legacy
+        WHERE user_id IS NOT NULL AND post_id IS NOT NULL
+        """
+    )
+
+    op.create_table('user_likes',
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.Column('post_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    postgresql_partition_by='RANGE (created_at)'
+    )
+    op.create_index('ix_user_likes_created_at', 'user_likes', ['created_at'], unique=False)
+    op.create_index('ix_user_likes_user_id_post_id', 'user_likes', ['user_id', 'post_id'], unique=False)
+    # One partition per month from the oldest like to PARTITIONS_AHEAD months from now. The default
+    # partition holds the likes without created_at, stored before the column existed.
+    op.execute(
+        f"""
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', coalesce(min(created_at), now())),
+                    date_trunc('month', now()) + interval '{PARTITIONS_AHEAD} months',
+                    interval '1 month'
+                )::date
+                FROM user_likes_legacy
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF user_likes FOR VALUES FROM (%L) TO (%L)',
+                    'user_likes_p' || to_char(month, 'YYYYMM'), month, month + interval '1 month'
+                );
+            END LOOP;
+        END
+        $$
+        """
+    )
+    op.execute("CREATE TABLE user_likes_default PARTITION OF user_likes DEFAULT")
+    op.execute(
+        """
+        INSERT INTO user_likes (user_id, post_id, created_at)
+        SELECT user_id, post_id, created_at FROM user_likes_legacy
+        """
+    )
+    op.drop_table('user_likes_legacy')
+
+
+def downgrade() -> None:
+    op.drop_table('user_likes')
+    op.create_table('user_likes',
+    sa.Column('user_id', sa.UUID(), nullable=True),
+    sa.Column('post_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE')
+    )
+    # The log and the partitions detached by the archive job are left out, user_post_likes has every current like.
+    op.execute(
+        """
+        INSERT INTO user_likes (user_id, post_id, created_at)
+        SELECT user_id, post_id, created_at FROM user_post_likes
+        """
+    )
+    op.drop_index('ix_user_post_likes_post_id', table_name='user_post_likes')
+    op.drop_table('user_post_likes')
+    op.create_index('ux_user_likes_user_id_post_id', 'user_likes', ['user_id', 'post_id'], unique=True)
+    op.create_index('ix_user_likes_created_at', 'user_likes', ['created_at'], unique=False)
@@ -0,0 +1,47 @@
+"""Add like_count to posts and unique (user_id, post_id) to user_likes
+
+Revision ID: 492e07b6e472
+Revises: e573b894bb82
+Create Date: 2026-10-18 20:11:37.502816
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '492e07b6e472'
+down_revision: Union[str, None] = 'e573b894bb82'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Duplicate likes could be stored before the unique index existed, keep one of each.
+    op.execute(
+        """
+        DELETE FROM user_likes a
+        USING user_likes b
+        WHERE a.ctid < b.ctid
+          AND a.user_id = b.user_id
+          AND a.post_id = b.post_id
+        """
+    )
+    op.create_index('ux_user_likes_user_id_post_id', 'user_likes', ['user_id', 'post_id'], unique=True)
+
+    op.add_column('posts', sa.Column('like_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        """
+        UPDATE posts
+        SET like_count = likes.total
+        FROM (SELECT post_id, count(*) AS total FROM user_likes GROUP BY post_id) AS likes
+        WHERE likes.post_id = posts.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('posts', 'like_count')
+    op.drop_index('ux_user_likes_user_id_post_id', table_name='user_likes')
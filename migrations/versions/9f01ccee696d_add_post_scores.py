@@ -0,0 +1,50 @@
+"""Add post_scores with the trending rank of posts
+
+Revision ID: 9f01ccee696d
+Revises: 15b5b0c15f89
+Create Date: 2026-10-18 22:05:51.730118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9f01ccee696d'
+down_revision: Union[str, None] = '15b5b0c15f89'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Must match TRENDING_EPOCH and the trending_half_life_seconds default the ranks are backfilled with.
+EPOCH = '2024-01-01'
+HALF_LIFE_SECONDS = 6 * 3600
+NOW_UNITS = f"extract(epoch FROM localtimestamp - timestamp '{EPOCH}') / {HALF_LIFE_SECONDS}"
+
+
+def upgrade() -> None:
+    op.create_table('post_scores',
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('hot_rank', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('post_id')
+    )
+    # Likes older than a week weigh less than 2 ** -28 of a new one and are left out.
+    op.execute(
+        f"""
+        INSERT INTO post_scores (post_id, hot_rank)
+        SELECT post_id, {NOW_UNITS} + ln(sum(
+            power(0.5, extract(epoch FROM localtimestamp - created_at) / {HALF_LIFE_SECONDS})
+        )) / ln(2)
+        FROM user_likes
+        WHERE created_at > localtimestamp - interval '7 days'
+        GROUP BY post_id
+        """
+    )
+    op.create_index('ix_post_scores_hot_rank_post_id', 'post_scores', ['hot_rank', 'post_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_post_scores_hot_rank_post_id', table_name='post_scores')
+    op.drop_table('post_scores')
@@ -0,0 +1,43 @@
+"""Add like_daily_stats rollup and index user_likes.created_at
+
+Revision ID: c2391ffb2333
+Revises: 492e07b6e472
+Create Date: 2026-10-18 20:34:02.918143
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c2391ffb2333'
+down_revision: Union[str, None] = '492e07b6e472'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_user_likes_created_at', 'user_likes', ['created_at'], unique=False)
+    op.create_table('like_daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('shard', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('like_count', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('day', 'shard')
+    )
+    # The backfilled counts go to shard 0, new likes are spread over the other shards too.
+    op.execute(
+        """
+        INSERT INTO like_daily_stats (day, like_count)
+        SELECT date(created_at), count(*)
+        FROM user_likes
+        WHERE created_at IS NOT NULL
+        GROUP BY date(created_at)
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('like_daily_stats')
+    op.drop_index('ix_user_likes_created_at', table_name='user_likes')
@@ -0,0 +1,27 @@
+"""Add posts.version_at bumped by every change of a post
+
+Revision ID: c41af7362ee5
+Revises: 29c8bf0790f8
+Create Date: 2026-10-19 01:12:40.518306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41af7362ee5'
+down_revision: Union[str, None] = '29c8bf0790f8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('posts', sa.Column('version_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False))
+    op.execute("UPDATE posts SET version_at = coalesce(updated_at, created_at, version_at)")
+
+
+def downgrade() -> None:
+    op.drop_column('posts', 'version_at')
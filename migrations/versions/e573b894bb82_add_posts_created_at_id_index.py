@@ -0,0 +1,26 @@
+"""Add (created_at, id) index on posts for keyset pagination
+
+Revision ID: e573b894bb82
+Revises: 4c0bb813df0b
+Create Date: 2026-10-18 19:52:10.214375
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e573b894bb82'
+down_revision: Union[str, None] = '4c0bb813df0b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_posts_created_at_id', 'posts', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_posts_created_at_id', table_name='posts')
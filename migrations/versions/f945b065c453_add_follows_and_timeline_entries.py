@@ -0,0 +1,50 @@
+"""Add follows, timeline_entries and user.follower_count
+
+Revision ID: f945b065c453
+Revises: c2391ffb2333
+Create Date: 2026-10-18 21:12:40.551209
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f945b065c453'
+down_revision: Union[str, None] = 'c2391ffb2333'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('user', sa.Column('follower_count', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('follows',
+    sa.Column('follower_id', sa.UUID(), nullable=False),
+    sa.Column('followee_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['followee_id'], ['user.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['follower_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('follower_id', 'followee_id')
+    )
+    op.create_index('ix_follows_followee_id', 'follows', ['followee_id'], unique=False)
+    op.create_table('timeline_entries',
+    sa.Column('user_id', sa.UUID(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'post_id')
+    )
+    op.create_index('ix_timeline_entries_user_id_created_at_post_id', 'timeline_entries', ['user_id', 'created_at', 'post_id'], unique=False)
+    op.create_index('ix_posts_owner_id_created_at_id', 'posts', ['owner_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_posts_owner_id_created_at_id', table_name='posts')
+    op.drop_index('ix_timeline_entries_user_id_created_at_post_id', table_name='timeline_entries')
+    op.drop_table('timeline_entries')
+    op.drop_index('ix_follows_followee_id', table_name='follows')
+    op.drop_table('follows')
+    op.drop_column('user', 'follower_count')
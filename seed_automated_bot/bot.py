@@ -1,23 +1,85 @@
+import argparse
+import asyncio
 import json
-import string
 import random
+import string
+import time
+from collections import defaultdict
 
-import requests
+import httpx
 from faker import Faker
 
-with open("config.json") as config_file:
-    config = json.load(config_file)
-
-NUMBER_OF_USERS = config['number_of_users']
-MAX_POSTS_PER_USER = config['max_posts_per_user']
-MAX_LIKES_PER_USER = config['max_likes_per_user']
-
-BASE_URL = 'http://127.0.0.1:8000'
 CREATE_POST_URL = '/api/post/create'
 REGISTER_URL = "/auth/register"
 LOGIN_URL = '/auth/jwt/login'
 GET_ALL_POSTS_URL = "/api/post/all"
 
+DEFAULT_CONFIG = {
+    "base_url": "http://127.0.0.1:8000",
+    "number_of_users": 2,
+    "max_posts_per_user": 22,
+    "max_likes_per_user": 35,
+    "concurrency": 10,
+    "duration_seconds": 0,
+    "request_mix": {"feed": 50, "read_post": 30, "like": 15, "create_post": 5},
+}
+
+fake_user = Faker(['en_CA'])
+
+
+class EndpointStats:
+    """
+    Collects per-endpoint latencies and status codes of the requests made by the bot.
+    """
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.failures = defaultdict(int)
+
+    def record(self, name, latency, status_code):
+        self.latencies[name].append(latency)
+        self.statuses[name][status_code] += 1
+
+    def record_failure(self, name):
+        self.failures[name] += 1
+
+    @staticmethod
+    def percentile(values, percent):
+        """
+        The percentile function returns the value below which the given percent of the sorted values fall.
+
+        :param values: Sorted list of latencies
+        :param percent: Percentile between 0 and 100
+        :return: The latency at the given percentile
+        """
+        if not values:
+            return 0.0
+        index = min(len(values) - 1, max(0, round(percent / 100 * len(values)) - 1))
+        return values[index]
+
+    def summary(self, elapsed):
+        """
+        The summary function aggregates the collected samples into throughput and latency percentiles.
+
+        :param elapsed: Wall clock duration of the phase in seconds
+        :return: A dictionary with one entry per endpoint
+        """
+        report = {}
+        for name in sorted(self.latencies.keys() | self.failures.keys()):
+            latencies = sorted(self.latencies[name])
+            report[name] = {
+                "requests": len(latencies),
+                "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(self.percentile(latencies, 50) * 1000, 2),
+                "p95_ms": round(self.percentile(latencies, 95) * 1000, 2),
+                "p99_ms": round(self.percentile(latencies, 99) * 1000, 2),
+                "max_ms": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+                "statuses": dict(self.statuses[name]),
+                "failures": self.failures[name],
+            }
+        return report
+
 
 def generate_password(length=12):
     """
@@ -33,125 +95,194 @@ def generate_password(length=12):
     return password
 
 
-def registation_user(json_data):
+async def timed_request(client, stats, name, method, url, **kwargs):
     """
-    The registation_user function takes in a json_data object and sends it to the server.
-    The function returns the response from the server.
+    The timed_request function sends one request and records its latency and status code under the given name.
+    Transport errors are counted as failures instead of being raised.
 
-    :param json_data: Pass the json data to the api
-    :return: A response object
+    :param client: The shared httpx.AsyncClient
+    :param stats: EndpointStats collecting the samples
+    :param name: Endpoint name used in the report
+    :param method: HTTP method
+    :param url: Path relative to the base url
+    :return: A response object, or None if the request failed
     """
-    url = BASE_URL + REGISTER_URL
-    headers = {'Content-Type': 'application/json'}
-    response = requests.post(url, headers=headers, json=json_data)
+    started = time.perf_counter()
+    try:
+        response = await client.request(method, url, **kwargs)
+    except httpx.HTTPError:
+        stats.record_failure(name)
+        return None
+    stats.record(name, time.perf_counter() - started, response.status_code)
     return response
 
 
-def login_and_get_token(form_data):
+async def register_and_login(client, stats):
     """
-    The login_and_get_token function takes a dictionary of form data as an argument.
-    It then makes a POST request to the login endpoint, passing in the form data.
-    If the response status code is 200, it returns the access token from that response's JSON payload.
+    The register_and_login function signs up a fake user and logs in with its credentials.
 
-    :param form_data: Pass in the username and password to the login_and_get_token function
-    :return: A JWT token
+    :param client: The shared httpx.AsyncClient
+    :param stats: EndpointStats collecting the samples
+    :return: A JWT token, or None if authentication failed
     """
-    url = BASE_URL + LOGIN_URL
-    response = requests.post(url, data=form_data)
-    if response.status_code == 200:
-        token = response.json().get('access_token')
-        return token
-    else:
-        print("Authentication error::", response.status_code)
+    fake_user_name = fake_user.user_name()
+    fake_email = f"{random.getrandbits(32):08x}.{fake_user.ascii_email()}"
+    fake_password = generate_password(8)
+    registration_data = {
+        "email": fake_email,
+        "password": fake_password,
+        "is_active": True,
+        "is_superuser": False,
+        "is_verified": False,
+        "username": fake_user_name
+    }
+    await timed_request(client, stats, "register", "POST", REGISTER_URL, json=registration_data)
+
+    login_data = {
+        'username': fake_email,
+        'password': fake_password
+    }
+    response = await timed_request(client, stats, "login", "POST", LOGIN_URL, data=login_data)
+    if response is None or response.status_code != 200:
+        print("Authentication error::", response.status_code if response else "connection failed")
         return None
+    return response.json().get('access_token')
 
 
-def create_posts_with_token(token, num_of_posts=MAX_POSTS_PER_USER):
+async def create_post(client, stats, token):
     """
-    The create_posts_with_token function creates a number of posts for the user with the given JWT token.
-    The function takes in two arguments:
-        - token: The JWT access_token of the user who will be creating posts.
-        - num_of_posts (optional): The number of posts to create for this user, defaults to MAX_POSTS_PER_USER.
+    The create_post function creates one post with random content on behalf of the user.
 
+    :param client: The shared httpx.AsyncClient
+    :param stats: EndpointStats collecting the samples
     :param token: Authenticate the user
-    :param num_of_posts: Specify how many posts to create
-    :return: Nothing
+    :return: The ID of the created post, or None
     """
-    url = BASE_URL + CREATE_POST_URL
-    headers = {
-        'Authorization': f'Bearer {token}',
-        'Content-Type': 'application/x-www-form-urlencoded'
-    }
-    for _ in range(num_of_posts):
-        post_data = {
-            'text': fake_user.sentence(nb_words=10)
-        }
-        requests.post(url, headers=headers, data=post_data)
+    headers = {'Authorization': f'Bearer {token}'}
+    post_data = {'text': fake_user.sentence(nb_words=10)}
+    response = await timed_request(client, stats, "create_post", "POST", CREATE_POST_URL, headers=headers, data=post_data)
+    if response is None or response.status_code != 201:
+        return None
+    return response.json()["id"]
+
+
+async def like_post(client, stats, token, post_id):
+    headers = {'Authorization': f'Bearer {token}'}
+    await timed_request(client, stats, "like", "POST", f"/api/post/{post_id}/like", headers=headers)
+
+
+async def read_post(client, stats, token, post_id):
+    headers = {'Authorization': f'Bearer {token}'}
+    await timed_request(client, stats, "read_post", "GET", f"/api/post/{post_id}", headers=headers)
+
+
+async def read_feed(client, stats):
+    await timed_request(client, stats, "feed", "GET", GET_ALL_POSTS_URL)
 
 
-def add_likes_to_posts(token, num_of_likes=MAX_LIKES_PER_USER, username="None"):
+async def seed_user(client, stats, config, semaphore, post_ids):
     """
-    The add_likes_to_posts function takes in a JWT token and the number of likes to add.
-    It then makes a GET request to get all posts, and gets the total number of posts.
-    Then it loops through that many times, generating random post ids between 1 and the total number of posts.
-    If that post id has not been liked yet by this user (to avoid duplicate likes), it will make a POST request to like that post.
+    The seed_user function registers one user, creates up to max_posts_per_user posts and
+    likes up to max_likes_per_user random posts among the ones created so far.
 
-    :param token: Authenticate the user
-    :param num_of_likes: Determine how many likes the user will give to posts
-    :param username: Print the name of the user who liked a post
-    :return: Nothing
+    :param client: The shared httpx.AsyncClient
+    :param stats: EndpointStats collecting the samples
+    :param config: Bot configuration
+    :param semaphore: Bounds the number of requests in flight
+    :param post_ids: Shared list of created post IDs
+    :return: A JWT token, or None
     """
-    headers = {
-                'Authorization': f'Bearer {token}',
-                'accept': 'application/json'
-            }
-    liked_post_ids = []
-    total_posts = requests.get(BASE_URL + GET_ALL_POSTS_URL)
-    total_posts = len(total_posts.json())
-    print(f"Total posts now = {total_posts}")
-    for _ in range(num_of_likes):
-        post_id = random.randint(1, total_posts)
+    async with semaphore:
+        token = await register_and_login(client, stats)
+    if token is None:
+        return None
+
+    for _ in range(random.randint(1, config["max_posts_per_user"])):
+        async with semaphore:
+            post_id = await create_post(client, stats, token)
+        if post_id is not None:
+            post_ids.append(post_id)
+
+    liked_post_ids = set()
+    for _ in range(random.randint(0, config["max_likes_per_user"])):
+        if not post_ids:
+            break
+        post_id = random.choice(post_ids)
         if post_id not in liked_post_ids:
-            url = BASE_URL + f"/api/post/{post_id}/like"
-            requests.post(url, headers=headers)
-            liked_post_ids.append(post_id)
-            print(f"{username.capitalize()} liked Post № {post_id}")
+            async with semaphore:
+                await like_post(client, stats, token, post_id)
+            liked_post_ids.add(post_id)
+    return token
 
 
-fake_user = Faker(['en_CA'])
+async def load_worker(client, stats, config, tokens, post_ids, deadline):
+    """
+    The load_worker function sends requests picked from request_mix until the deadline.
 
-# !  _____________MAIN LOOP____________
-# !  __________________________________
-for user in range(NUMBER_OF_USERS):
-    # !  ________Creating fake user data________
-    fake_user_name = fake_user.user_name()
-    fake_email = fake_user.ascii_email()
-    fake_password = generate_password(8)
-    print(f"Working with {fake_user_name}...")
+    :param client: The shared httpx.AsyncClient
+    :param stats: EndpointStats collecting the samples
+    :param config: Bot configuration
+    :param tokens: JWT tokens of the seeded users
+    :param post_ids: Shared list of created post IDs
+    :param deadline: time.monotonic() value at which the worker stops
+    :return: Nothing
+    """
+    actions = list(config["request_mix"].keys())
+    weights = list(config["request_mix"].values())
+    while time.monotonic() < deadline:
+        action = random.choices(actions, weights)[0]
+        token = random.choice(tokens)
+        if action == "feed":
+            await read_feed(client, stats)
+        elif action == "read_post":
+            await read_post(client, stats, token, random.choice(post_ids))
+        elif action == "like":
+            await like_post(client, stats, token, random.choice(post_ids))
+        elif action == "create_post":
+            post_id = await create_post(client, stats, token)
+            if post_id is not None:
+                post_ids.append(post_id)
+        else:
+            raise ValueError(f"Unknown action in request_mix: {action}")
 
-    # !  ________REGISTRATION________
 
-    registration_data = {
-        "email": fake_email,
-        "password": fake_password,
-        "is_active": True,
-        "is_superuser": False,
-        "is_verified": False,
-        "username": fake_user_name
-    }
-    registation_user(registration_data)
+async def run(config):
+    concurrency = config["concurrency"]
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=config["base_url"], limits=limits, timeout=30) as client:
+        # !  ________SEEDING: signup, posts and likes________
+        stats = EndpointStats()
+        semaphore = asyncio.Semaphore(concurrency)
+        post_ids = []
+        started = time.perf_counter()
+        tokens = await asyncio.gather(
+            *(seed_user(client, stats, config, semaphore, post_ids) for _ in range(config["number_of_users"]))
+        )
+        tokens = [token for token in tokens if token]
+        report = {"seed": stats.summary(time.perf_counter() - started)}
 
-    # !  ________Login and get JWT________
-    login_data = {
-        'username': fake_email,
-        'password': fake_password
-    }
-    jwt_token = login_and_get_token(login_data)
+        # !  ________LOAD: request mix for duration_seconds________
+        if config["duration_seconds"] > 0 and tokens and post_ids:
+            stats = EndpointStats()
+            started = time.perf_counter()
+            deadline = time.monotonic() + config["duration_seconds"]
+            await asyncio.gather(
+                *(load_worker(client, stats, config, tokens, post_ids, deadline) for _ in range(concurrency))
+            )
+            report["load"] = stats.summary(time.perf_counter() - started)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the API with fake activity and generate load against it.")
+    parser.add_argument("--config", default="config.json", help="Path to the JSON configuration file")
+    args = parser.parse_args()
 
-    # !  ________Creating new posts________
-    create_posts_with_token(jwt_token)
+    with open(args.config) as config_file:
+        config = {**DEFAULT_CONFIG, **json.load(config_file)}
+    report = asyncio.run(run(config))
+    print(json.dumps(report, indent=2))
 
-    # !  ________User add likes for posts________
-    add_likes_to_posts(jwt_token, username=fake_user_name)
 
-    user += 1
+if __name__ == '__main__':
+    main()
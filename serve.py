@@ -0,0 +1,80 @@
+"""
+Production entry point: serves main:app with several uvicorn worker processes.
+
+Every worker is a separate process with its own event loop, database pool and
+in-memory caches, so with several workers the post cache defaults to Redis. The
+defaults come from the SERVER_* settings and can be overridden on the command line:
+
+    python serve.py --workers 16 --loop uvloop --http httptools
+
+`--workers 0` starts one worker per CPU core.
+"""
+import argparse
+import os
+
+import uvicorn
+
+from src.config import settings
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the API with several worker processes.")
+    parser.add_argument("--host", default=settings.server_host)
+    parser.add_argument("--port", type=int, default=settings.server_port)
+    parser.add_argument("--workers", type=int, default=settings.server_workers,
+                        help="Number of worker processes, 0 for one per CPU core")
+    parser.add_argument("--loop", default=settings.server_loop, choices=["auto", "asyncio", "uvloop"],
+                        help="Event loop; auto picks uvloop when it is installed")
+    parser.add_argument("--http", default=settings.server_http, choices=["auto", "h11", "httptools"],
+                        help="HTTP parser; auto picks httptools when it is installed")
+    parser.add_argument("--backlog", type=int, default=settings.server_backlog)
+    parser.add_argument("--keep-alive", type=int, default=settings.server_keep_alive,
+                        help="Seconds to keep idle connections open")
+    parser.add_argument("--graceful-shutdown", type=int, default=settings.server_graceful_shutdown,
+                        help="Seconds to let in-flight requests finish on shutdown")
+    parser.add_argument("--log-level", default="info")
+    return parser.parse_args(argv)
+
+
+def share_post_cache(workers: int) -> None:
+    """
+    Make the workers share the post cache.
+
+    An in-memory cache is only invalidated in the worker handling the write, the
+    others would keep serving deleted or stale posts until the TTL. With several
+    workers Redis becomes the default backend, and `memory` is refused.
+
+    :param workers: int: The number of worker processes.
+    :return: None.
+    """
+    if workers == 1:
+        return
+    if "post_cache_backend" not in settings.model_fields_set:
+        # The workers read their settings from the environment they inherit.
+        os.environ["POST_CACHE_BACKEND"] = "redis"
+    elif settings.post_cache_backend == "memory":
+        raise SystemExit("POST_CACHE_BACKEND=memory is per process, use redis or none with several workers")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workers = args.workers or os.cpu_count() or 1
+    share_post_cache(workers)
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        loop=args.loop,
+        http=args.http,
+        backlog=args.backlog,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_shutdown,
+        log_level=args.log_level,
+        access_log=False,
+        proxy_headers=True,
+    )
+
+
+if __name__ == "__main__":
+    main()
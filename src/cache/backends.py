@@ -0,0 +1,124 @@
+import logging
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+try:
+    from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+except ImportError:
+    RedisConnectionError = RedisTimeoutError = ConnectionError
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(ABC):
+    """
+    Minimal async key-value interface used by the application caches.
+
+    Values are opaque bytes, serialization is done by the caller.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None:
+        ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    def stats(self) -> dict:
+        return {}
+
+
+class InMemoryCache(CacheBackend):
+    """
+    In-process cache with per-entry TTL and LRU eviction.
+
+    Entries live in the memory of a single worker, so invalidations are not seen
+    by other worker processes until the entry expires.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.evictions = 0
+        self._entries: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "max_size": self.max_size, "evictions": self.evictions}
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache stored in a Redis-protocol server shared by all workers.
+
+    TTL is set per key, LRU eviction is left to the server maxmemory-policy.
+    Any client implementing the redis-py asyncio API can be passed, e.g. a local fake.
+
+    The cache is best effort: while the server is unreachable, get() misses and
+    set() and delete() do nothing, so requests fall through to the database
+    instead of failing. An entry whose delete failed is served until its TTL.
+    """
+
+    UNAVAILABLE_ERRORS = (RedisConnectionError, RedisTimeoutError, ConnectionError, TimeoutError)
+
+    def __init__(self, client, prefix: str = ""):
+        self.client = client
+        self.prefix = prefix
+        self.errors = 0
+
+    @classmethod
+    def from_url(cls, url: str, prefix: str = "") -> "RedisCache":
+        from redis.asyncio import Redis
+
+        return cls(Redis.from_url(url), prefix=prefix)
+
+    def _unavailable(self, operation: str, key: str, error: Exception) -> None:
+        self.errors += 1
+        logger.warning("Redis cache %s of %s failed: %r", operation, key, error)
+
+    async def get(self, key: str) -> bytes | None:
+        try:
+            return await self.client.get(self.prefix + key)
+        except self.UNAVAILABLE_ERRORS as error:
+            self._unavailable("get", key, error)
+            return None
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        try:
+            await self.client.set(self.prefix + key, value, px=int(ttl * 1000))
+        except self.UNAVAILABLE_ERRORS as error:
+            self._unavailable("set", key, error)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.client.delete(self.prefix + key)
+        except self.UNAVAILABLE_ERRORS as error:
+            self._unavailable("delete", key, error)
+
+    def stats(self) -> dict:
+        return {"errors": self.errors}
@@ -14,6 +14,85 @@ class Settings(BaseSettings):
 
     secret_key: str = Field()
     algorithm: str = Field()
+    jwt_lifetime_seconds: int = Field(default=3600)
+    auth_stateless: bool = Field(default=False)
+    auth_principal_cache_ttl: float = Field(default=30.0)
+    auth_principal_cache_max_size: int = Field(default=10_000)
+    password_schemes: list[str] = Field(default=["bcrypt"])
+    password_bcrypt_rounds: int = Field(default=12)
+    password_argon2_time_cost: int = Field(default=3)
+    password_argon2_memory_cost: int = Field(default=65536)
+    password_argon2_parallelism: int = Field(default=4)
+    password_hash_workers: int = Field(default=4)
+
+    db_pool_size: int = Field(default=5)
+    db_max_overflow: int = Field(default=10)
+    db_pool_timeout: float = Field(default=30.0)
+    db_pool_pre_ping: bool = Field(default=False)
+    db_pool_recycle: int = Field(default=-1)
+    db_prepared_statement_cache_size: int = Field(default=100)
+    db_pool_warmup: bool = Field(default=True)
+    db_replica_hosts: list[str] = Field(default=[])
+    db_replica_connect_timeout: float = Field(default=2.0)
+    db_replica_failure_cooldown: float = Field(default=30.0)
+    slow_query_threshold_ms: float = Field(default=200.0)
+    admission_enabled: bool = Field(default=True)
+    admission_max_concurrency: int = Field(default=15)
+    admission_read_limit: int = Field(default=10)
+    admission_write_limit: int = Field(default=10)
+    admission_analytics_limit: int = Field(default=2)
+    admission_queue_size: int = Field(default=100)
+    admission_queue_timeout: float = Field(default=1.0)
+    admission_priority_aging: float = Field(default=0.25)
+    admission_retry_after: int = Field(default=1)
+
+    server_host: str = Field(default="0.0.0.0")
+    server_port: int = Field(default=8000)
+    server_workers: int = Field(default=0)
+    server_loop: str = Field(default="auto")
+    server_http: str = Field(default="auto")
+    server_backlog: int = Field(default=2048)
+    server_keep_alive: int = Field(default=5)
+    server_graceful_shutdown: int = Field(default=30)
+
+    compression_enabled: bool = Field(default=True)
+    compression_min_size: int = Field(default=1024)
+    compression_gzip_level: int = Field(default=6)
+    compression_brotli_quality: int = Field(default=4)
+    compression_media_types: list[str] = Field(default=["application/json", "application/x-ndjson", "text/"])
+    cache_feed_max_age: int = Field(default=5)
+    cache_post_max_age: int = Field(default=30)
+
+    posts_page_size: int = Field(default=50)
+    posts_max_page_size: int = Field(default=200)
+    posts_stream_chunk_size: int = Field(default=500)
+    bulk_max_batch_size: int = Field(default=500)
+    like_write_behind: bool = Field(default=False)
+    like_wait_for_flush: bool = Field(default=True)
+    like_batch_interval_ms: float = Field(default=50.0)
+    like_batch_max_size: int = Field(default=500)
+    like_queue_max_depth: int = Field(default=50_000)
+    like_flush_max_retries: int = Field(default=3)
+    like_stats_shards: int = Field(default=16)
+    timeline_fanout_threshold: int = Field(default=10_000)
+    timeline_backfill_size: int = Field(default=200)
+
+    trending_half_life_seconds: float = Field(default=6 * 3600.0)
+    trending_min_score: float = Field(default=0.01)
+    trending_max_size: int = Field(default=100)
+    trending_snapshot_ttl: float = Field(default=10.0)
+
+    likes_partitions_ahead: int = Field(default=3)
+    likes_retention_months: int = Field(default=0)
+    likes_partition_maintenance_interval: float = Field(default=6 * 3600.0)
+
+    post_cache_backend: str = Field(default="memory")
+    post_cache_ttl: float = Field(default=60.0)
+    post_cache_max_size: int = Field(default=10_000)
+    redis_url: str = Field(default="redis://localhost:6379/0")
+
+    activity_tracking: bool = Field(default=True)
+    activity_flush_interval: float = Field(default=5.0)
 
     class Config:
         env_file = ".env"
@@ -1,12 +1,18 @@
 import asyncio
-from typing import AsyncGenerator
+import logging
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator
 
 from fastapi import Depends
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy import text
 from src.config import settings
 from src.database.models import Base, User
+from src.database.pool import InstrumentedAsyncQueuePool
+from src.monitoring.instrumentation import instrument_engine
 
 user = settings.postgres_user
 pwd = settings.postgres_password
@@ -16,7 +22,101 @@ db = settings.postgres_db
 
 DATABASE_URL = f"postgresql+asyncpg://{user}:{pwd}@{host}:{port}/{db}"
 
-engine = create_async_engine(DATABASE_URL)
+logger = logging.getLogger(__name__)
+
+
+def create_instrumented_engine(url: str, **kwargs) -> AsyncEngine:
+    """
+    Create an engine with the pool settings and SQL instrumentation shared by the primary and the replicas.
+
+    :param url: str: The database URL.
+    :param kwargs: Overrides of the create_async_engine arguments.
+    :return: AsyncEngine: The new engine.
+    """
+    options = {
+        "poolclass": InstrumentedAsyncQueuePool,
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+        "connect_args": {"prepared_statement_cache_size": settings.db_prepared_statement_cache_size},
+        **kwargs,
+    }
+    new_engine = create_async_engine(url, **options)
+    instrument_engine(new_engine)
+    return new_engine
+
+
+def replica_url(replica_host: str) -> str:
+    """
+    Build the URL of a read replica given as host or host:port, with the credentials of the primary.
+
+    :param replica_host: str: The host of the replica, optionally with a port.
+    :return: str: The database URL of the replica.
+    """
+    replica_host, _, replica_port = replica_host.partition(":")
+    return f"postgresql+asyncpg://{user}:{pwd}@{replica_host}:{replica_port or port}/{db}"
+
+
+class ReplicaSet:
+    """
+    Round-robin over the read replica engines, skipping replicas that failed recently.
+
+    A replica whose connection checkout fails is left out for `cooldown` seconds,
+    then tried again by the next request that reaches it.
+    """
+
+    def __init__(self, engines: dict[str, AsyncEngine], cooldown: float):
+        self.engines = engines
+        self.cooldown = cooldown
+        self._names = list(engines)
+        self._next = 0
+        self._down_until = {name: 0.0 for name in engines}
+        self.failovers = 0
+
+    def available(self) -> list[str]:
+        """
+        Get the healthy replicas in the order they should be tried.
+
+        :return: list[str]: The names of the replicas, starting with the next one in the rotation.
+        """
+        if not self._names:
+            return []
+        start, self._next = self._next, (self._next + 1) % len(self._names)
+        now = time.monotonic()
+        rotation = self._names[start:] + self._names[:start]
+        return [name for name in rotation if self._down_until[name] <= now]
+
+    def mark_down(self, name: str) -> None:
+        self._down_until[name] = time.monotonic() + self.cooldown
+        self.failovers += 1
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "replicas": len(self._names),
+            "healthy": sum(self._down_until[name] <= now for name in self._names),
+            "failovers": self.failovers,
+        }
+
+
+engine = create_instrumented_engine(DATABASE_URL)
+# Checkout is the replica health check, hence pre-ping and a short connect timeout.
+replica_set = ReplicaSet(
+    {
+        f"replica{index}": create_instrumented_engine(
+            replica_url(replica_host),
+            pool_pre_ping=True,
+            connect_args={
+                "prepared_statement_cache_size": settings.db_prepared_statement_cache_size,
+                "timeout": settings.db_replica_connect_timeout,
+            },
+        )
+        for index, replica_host in enumerate(settings.db_replica_hosts)
+    },
+    cooldown=settings.db_replica_failure_cooldown,
+)
 async_session_maker = async_sessionmaker(engine, expire_on_commit=False)
 
 
@@ -25,11 +125,81 @@ async def create_db_and_tables():
         await conn.run_sync(Base.metadata.create_all)
 
 
+async def warm_up_pool(connections: int) -> None:
+    """
+    Open pool connections up front, so the first requests of a worker do not pay for connecting.
+
+    All connections are held until the last one is open, so the pool really grows
+    to `connections` instead of reusing the first one, then returned to it.
+
+    :param connections: int: The number of connections to open, at most pool_size stay idle in the pool.
+    :return: None.
+    """
+    async with AsyncExitStack() as stack:
+        for _ in range(connections):
+            connection = await stack.enter_async_context(engine.connect())
+            await connection.execute(text("SELECT 1"))
+
+
+async def dispose_engines() -> None:
+    """
+    Close the connections of the primary and replica pools.
+
+    :return: None.
+    """
+    await engine.dispose()
+    for replica in replica_set.engines.values():
+        await replica.dispose()
+
+
 async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
         yield session
 
 
+@asynccontextmanager
+async def read_session() -> AsyncIterator[AsyncSession]:
+    """
+    Open a session on a healthy read replica, falling back to the primary.
+
+    Replicas are tried in round-robin order; one whose connection cannot be
+    checked out is marked down and the next one is tried. Replicas lag behind the
+    primary, so use it only for reads that tolerate slightly stale data. The
+    session is tagged with the replica name, see is_replica_session.
+
+    :return: AsyncIterator[AsyncSession]: The session, closed on exit.
+    """
+    for name in replica_set.available():
+        session = async_session_maker(bind=replica_set.engines[name], info={"replica": name})
+        try:
+            await session.connection()
+        except (OSError, TimeoutError, SQLAlchemyError):
+            logger.warning("Read replica %s is unavailable, failing over", name, exc_info=True)
+            await session.close()
+            replica_set.mark_down(name)
+            continue
+        async with session:
+            yield session
+        return
+    async with async_session_maker() as session:
+        yield session
+
+
+def is_replica_session(session: AsyncSession) -> bool:
+    """
+    Tell whether a session reads from a replica, whose rows may predate the latest writes.
+
+    :param session: AsyncSession: The session.
+    :return: bool: True if the session was opened on a read replica by read_session.
+    """
+    return "replica" in session.info
+
+
+async def get_read_session() -> AsyncGenerator[AsyncSession, None]:
+    async with read_session() as session:
+        yield session
+
+
 async def get_user_db(session: AsyncSession = Depends(get_async_session)):
     yield SQLAlchemyUserDatabase(session, User)
 
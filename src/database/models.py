@@ -1,19 +1,62 @@
+from datetime import datetime
+
 from fastapi_users_db_sqlalchemy import SQLAlchemyBaseUserTableUUID
-from sqlalchemy import ForeignKey, Integer, DateTime, func, String, Column, UUID, Table
+from sqlalchemy import (
+    ForeignKey, Integer, Float, DateTime, Date, func, String, Column, UUID, Table, Index, Computed
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import DeclarativeBase, relationship, deferred
 
-from sqlalchemy.orm import DeclarativeBase, relationship
+# Text search configuration of posts.search_vector, baked into the generated column.
+SEARCH_CONFIG = "english"
+# Origin of post_scores.hot_rank, changing it (or the half-life) invalidates the stored ranks.
+TRENDING_EPOCH = datetime(2024, 1, 1)
 
 
 class Base(DeclarativeBase):
     pass
 
 
+# The current likes, one row per (user, post). Likes and unlikes insert and delete here.
+like_keys_table = Table(
+    "user_post_likes",
+    Base.metadata,
+    Column("user_id", UUID(as_uuid=True), ForeignKey("user.id", ondelete="CASCADE"), primary_key=True),
+    Column("post_id", Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True),
+    Column("created_at", DateTime, default=func.now()),
+    Index("ix_user_post_likes_post_id", "post_id"),
+)
+
+# Append-only log of the likes made, partitioned by month, see src/database/partitions.py.
+# No unique index can span the partitions, uniqueness is kept by user_post_likes.
 association_table = Table(
     "user_likes",
     Base.metadata,
     Column("user_id", UUID(as_uuid=True), ForeignKey("user.id", ondelete="CASCADE")),
     Column("post_id", Integer, ForeignKey("posts.id", ondelete="CASCADE")),
-    Column("created_at", DateTime, default=func.now())
+    Column("created_at", DateTime, default=func.now()),
+    Index("ix_user_likes_user_id_post_id", "user_id", "post_id"),
+    Index("ix_user_likes_created_at", "created_at"),
+    postgresql_partition_by="RANGE (created_at)",
+)
+
+
+follows_table = Table(
+    "follows",
+    Base.metadata,
+    Column("follower_id", UUID(as_uuid=True), ForeignKey("user.id", ondelete="CASCADE"), primary_key=True),
+    Column("followee_id", UUID(as_uuid=True), ForeignKey("user.id", ondelete="CASCADE"), primary_key=True),
+    Column("created_at", DateTime, default=func.now()),
+    Index("ix_follows_followee_id", "followee_id"),
+)
+
+timeline_table = Table(
+    "timeline_entries",
+    Base.metadata,
+    Column("user_id", UUID(as_uuid=True), ForeignKey("user.id", ondelete="CASCADE"), primary_key=True),
+    Column("post_id", Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True),
+    Column("created_at", DateTime, nullable=False),
+    Index("ix_timeline_entries_user_id_created_at_post_id", "user_id", "created_at", "post_id"),
 )
 
 
@@ -21,20 +64,53 @@ class User(SQLAlchemyBaseUserTableUUID, Base):
     __table_args__ = {"extend_existing": True}
     username = Column(String(50), nullable=False)
     created_at = Column(DateTime, default=func.now())
-    posts = relationship("Post", back_populates="owner", cascade="all, delete", lazy="joined")
-    liked_posts = relationship("Post", secondary=association_table, back_populates="likers", cascade="all, delete",
-                               lazy="selectin")
+    posts = relationship("Post", back_populates="owner", cascade="all, delete", passive_deletes=True,
+                         lazy="raise_on_sql")
+    liked_posts = relationship("Post", secondary=like_keys_table, back_populates="likers", cascade="all, delete",
+                               passive_deletes=True, lazy="raise_on_sql")
     last_login = Column(DateTime, default=None)
     last_request_time = Column(DateTime, default=None)
+    follower_count = Column(Integer, nullable=False, default=0, server_default="0")
 
 
 class Post(Base):
     __tablename__ = "posts"
+    __table_args__ = (
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        Index("ix_posts_owner_id_created_at_id", "owner_id", "created_at", "id"),
+        Index("ix_posts_search_vector", "search_vector", postgresql_using="gin"),
+    )
     id = Column(Integer, primary_key=True)
     owner_id = Column(UUID(as_uuid=True), ForeignKey("user.id", ondelete="CASCADE"))
     text = Column(String(555), nullable=True, default=None)
     created_at = Column(DateTime, default=func.now())
     updated_at = Column(DateTime, default=None, onupdate=func.now(), nullable=True)
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")
+    # Bumped by every UPDATE of the row, like counter updates included, for Last-Modified.
+    version_at = Column(DateTime, nullable=False, default=func.now(), onupdate=func.now(), server_default=func.now())
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(f"to_tsvector('{SEARCH_CONFIG}', coalesce(text, ''))", persisted=True))
+    )
     owner = relationship("User", back_populates="posts", lazy="noload", cascade="all, delete")
-    likers = relationship("User", secondary=association_table, back_populates="liked_posts", lazy="selectin", cascade="all, delete")
+    likers = relationship("User", secondary=like_keys_table, back_populates="liked_posts", lazy="raise_on_sql",
+                          cascade="all, delete", passive_deletes=True)
+
+
+class LikeDailyStats(Base):
+    __tablename__ = "like_daily_stats"
+    day = Column(Date, primary_key=True)
+    shard = Column(Integer, primary_key=True, default=0, server_default="0")
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")
+
 
+class PostScore(Base):
+    # Kept out of posts, so that the like counter updates of posts stay HOT (no posts
+    # index is touched) and only this narrow table and its index are rewritten.
+    # hot_rank is log2 of the heat anchored at TRENDING_EPOCH: a like made at t weighs
+    # 2 ** ((t - TRENDING_EPOCH) / half-life), so the ranks never need to be decayed.
+    __tablename__ = "post_scores"
+    __table_args__ = (
+        Index("ix_post_scores_hot_rank_post_id", "hot_rank", "post_id"),
+    )
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), primary_key=True)
+    hot_rank = Column(Float, nullable=False)
@@ -0,0 +1,176 @@
+"""
+Monthly range partitions of user_likes.
+
+user_likes is the append-only log of the likes made. Each month lives in its own
+user_likes_pYYYYMM partition, so queries on a created_at range only scan the months
+they cover, and old months can be detached whole instead of deleted row by row.
+Partitions must exist before likes of their month arrive, otherwise the likes land
+in user_likes_default and that month cannot be created anymore until they are
+moved out.
+
+The current likes are kept in the unpartitioned user_post_likes, so detaching a
+month only archives its log: like counters, duplicate checks and unlikes are not
+affected.
+
+    python -m src.database.partitions --from 2024-01 --keep-months 12
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.database.database import async_session_maker
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "user_likes"
+PARTITION_PREFIX = "user_likes_p"
+# Creating or detaching a partition locks the whole table, give up rather than stall the likes.
+LOCK_TIMEOUT = "5s"
+MAINTENANCE_LOCK_KEY = 0x757365726C696B65
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITION_PREFIX}{month:%Y%m}"
+
+
+async def list_like_partitions(session: AsyncSession) -> dict[str, date | None]:
+    """
+    List the partitions attached to user_likes.
+
+    :param session: AsyncSession: The database session.
+    :return: dict[str, date | None]: The first day of the month of each partition by name, None for the default one.
+    """
+    stmt = text(
+        "SELECT child.relname FROM pg_inherits "
+        "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+        "WHERE pg_inherits.inhparent = CAST(:parent AS regclass)"
+    )
+    partitions = {}
+    for name in (await session.execute(stmt, {"parent": PARENT_TABLE})).scalars():
+        suffix = name.removeprefix(PARTITION_PREFIX)
+        if name.startswith(PARTITION_PREFIX) and len(suffix) == 6 and suffix.isdigit():
+            partitions[name] = date(int(suffix[:4]), int(suffix[4:]), 1)
+        else:
+            partitions[name] = None
+    return partitions
+
+
+async def ensure_like_partitions(session: AsyncSession, months_ahead: int, start: date | None = None) -> list[str]:
+    """
+    Create the missing monthly partitions from `start` to `months_ahead` months from now.
+
+    The caller commits.
+
+    :param session: AsyncSession: The database session.
+    :param months_ahead: int: The number of months after the current one to create.
+    :param start: date | None: A day of the first month to create, the current month if None.
+    :return: list[str]: The names of the partitions created.
+    """
+    existing = await list_like_partitions(session)
+    month = month_start(start or date.today())
+    last = add_months(month_start(date.today()), months_ahead)
+    created = []
+    await session.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+    while month <= last:
+        name = partition_name(month)
+        if name not in existing:
+            await session.execute(text(
+                f'CREATE TABLE IF NOT EXISTS "{name}" PARTITION OF {PARENT_TABLE} '
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+            ))
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+async def detach_old_like_partitions(session: AsyncSession, keep_months: int) -> list[str]:
+    """
+    Detach the monthly partitions older than the last `keep_months` months.
+
+    A detached partition stays in the database as a plain table, to be archived or
+    dropped. The likes it logged stay in user_post_likes, like_count and
+    like_daily_stats. The caller commits.
+
+    :param session: AsyncSession: The database session.
+    :param keep_months: int: The number of months to keep, the current one included.
+    :return: list[str]: The names of the partitions detached.
+    """
+    oldest_kept = add_months(month_start(date.today()), 1 - keep_months)
+    detached = []
+    await session.execute(text(f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"))
+    for name, month in sorted((await list_like_partitions(session)).items()):
+        if month is not None and month < oldest_kept:
+            await session.execute(text(f'ALTER TABLE {PARENT_TABLE} DETACH PARTITION "{name}"'))
+            detached.append(name)
+    return detached
+
+
+async def maintain_like_partitions() -> bool:
+    """
+    Create the upcoming partitions and, if likes_retention_months is set, detach the expired ones.
+
+    A transaction-level advisory lock makes only one worker do it at a time.
+
+    :return: bool: False if another worker holds the maintenance lock.
+    """
+    async with async_session_maker() as session:
+        stmt = text("SELECT pg_try_advisory_xact_lock(:key)")
+        if not (await session.execute(stmt, {"key": MAINTENANCE_LOCK_KEY})).scalar_one():
+            return False
+        created = await ensure_like_partitions(session, settings.likes_partitions_ahead)
+        detached = []
+        if settings.likes_retention_months > 0:
+            detached = await detach_old_like_partitions(session, settings.likes_retention_months)
+        await session.commit()
+    if created or detached:
+        logger.info("Created like partitions %s, detached %s", created, detached)
+    return True
+
+
+async def run_partition_maintenance(interval: float) -> None:
+    """
+    Run maintain_like_partitions now and then every `interval` seconds until cancelled.
+
+    :param interval: float: The number of seconds between runs.
+    :return: None.
+    """
+    while True:
+        try:
+            await maintain_like_partitions()
+        except Exception:
+            logger.exception("Failed to maintain the user_likes partitions")
+        await asyncio.sleep(interval)
+
+
+async def main(start: date | None, keep_months: int) -> None:
+    async with async_session_maker() as session:
+        created = await ensure_like_partitions(session, settings.likes_partitions_ahead, start)
+        detached = []
+        if keep_months > 0:
+            detached = await detach_old_like_partitions(session, keep_months)
+        await session.commit()
+    print(f"created: {created}\ndetached: {detached}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create and detach the monthly partitions of user_likes.")
+    parser.add_argument("--from", dest="start", type=lambda value: date.fromisoformat(f"{value}-01"),
+                        help="first month to create, as YYYY-MM (default: the current month)")
+    parser.add_argument("--keep-months", type=int, default=settings.likes_retention_months,
+                        help="detach the partitions older than this many months, 0 to keep all")
+    args = parser.parse_args()
+    asyncio.run(main(args.start, args.keep_months))
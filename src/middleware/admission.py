@@ -0,0 +1,213 @@
+import asyncio
+import re
+import time
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass, field
+
+from fastapi.responses import ORJSONResponse
+
+from src.config import settings
+
+
+@dataclass(slots=True)
+class AdmissionGroup:
+    name: str
+    limit: int
+    priority: int
+    active: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    waiters: deque = field(default_factory=deque)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "limit": self.limit,
+            "queued": len(self.waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class AdmissionRule:
+    group: str
+    methods: frozenset[str] | None
+    pattern: re.Pattern
+
+    def matches(self, method: str, path: str) -> bool:
+        return (self.methods is None or method in self.methods) and self.pattern.match(path) is not None
+
+
+class AdmissionController:
+    """
+    Bounds the number of requests running at once, overall and per route group.
+
+    A request over its group limit, or over `max_concurrency`, waits in its group
+    queue for up to `queue_timeout` seconds. When a slot frees up, the queues are
+    served by group priority, lowest value first, so cheap reads get ahead of
+    writes and analytics. Every `aging` seconds of waiting count as one priority
+    level, so a lower priority request still gets a slot under sustained load of
+    a higher priority group. A request arriving at a full queue, or still waiting
+    at the timeout, is rejected: when the database slows down the extra load is
+    shed right away instead of piling up on the engine pool.
+    """
+
+    def __init__(
+            self,
+            max_concurrency: int,
+            groups: list[AdmissionGroup],
+            queue_size: int,
+            queue_timeout: float,
+            aging: float,
+    ):
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.aging = aging
+        self.groups = {group.name: group for group in groups}
+        self.active = 0
+
+    def _has_room(self, group: AdmissionGroup) -> bool:
+        return self.active < self.max_concurrency and group.active < group.limit
+
+    def _admit(self, group: AdmissionGroup) -> None:
+        self.active += 1
+        group.active += 1
+        group.admitted += 1
+
+    async def acquire(self, name: str) -> bool:
+        """
+        Take a slot of a group, waiting for one if needed.
+
+        :param name: str: The name of the group.
+        :return: bool: True if admitted, then release() must be called, False if rejected.
+        """
+        group = self.groups[name]
+        if not group.waiters and self._has_room(group):
+            self._admit(group)
+            return True
+        if len(group.waiters) >= self.queue_size:
+            group.rejected += 1
+            return False
+
+        waiter = asyncio.get_running_loop().create_future()
+        entry = (time.monotonic(), waiter)
+        group.waiters.append(entry)
+        try:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(asyncio.shield(waiter), timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # The slot may have been handed over just before the cancellation.
+            if waiter.done() and not waiter.cancelled():
+                self.release(name)
+            raise
+        finally:
+            with suppress(ValueError):
+                group.waiters.remove(entry)
+        if waiter.done() and not waiter.cancelled():
+            return True
+        waiter.cancel()
+        group.timed_out += 1
+        return False
+
+    def release(self, name: str) -> None:
+        """
+        Give back a slot and hand the free slots over to the waiters, highest aged priority first.
+
+        :param name: str: The name of the group the slot was taken from.
+        :return: None.
+        """
+        group = self.groups[name]
+        self.active -= 1
+        group.active -= 1
+        now = time.monotonic()
+        while self.active < self.max_concurrency:
+            candidates = [
+                candidate for candidate in self.groups.values() if candidate.waiters and self._has_room(candidate)
+            ]
+            if not candidates:
+                return
+            chosen = min(candidates, key=lambda candidate: self._aged_priority(candidate, now))
+            _, waiter = chosen.waiters.popleft()
+            if not waiter.done():
+                self._admit(chosen)
+                waiter.set_result(None)
+
+    def _aged_priority(self, group: AdmissionGroup, now: float) -> tuple[float, int]:
+        enqueued_at, _ = group.waiters[0]
+        return group.priority - (now - enqueued_at) / self.aging, group.priority
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "max_concurrency": self.max_concurrency,
+            "queued": sum(len(group.waiters) for group in self.groups.values()),
+        }
+
+    def group_stats(self) -> dict[str, dict]:
+        return {name: group.stats() for name, group in self.groups.items()}
+
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware running requests through an AdmissionController.
+
+    The group of a request is the one of the first rule matching its method and
+    path. Requests matching no rule, such as the health check and the monitoring
+    endpoints, are never limited. Rejected requests get a 503 with Retry-After.
+    """
+
+    def __init__(self, app, controller: AdmissionController, rules: list[AdmissionRule], retry_after: int):
+        self.app = app
+        self.controller = controller
+        self.rules = rules
+        self.retry_after = retry_after
+
+    def group_of(self, scope) -> str | None:
+        for rule in self.rules:
+            if rule.matches(scope["method"], scope["path"]):
+                return rule.group
+        return None
+
+    async def __call__(self, scope, receive, send):
+        group = self.group_of(scope) if scope["type"] == "http" else None
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+        if not await self.controller.acquire(group):
+            response = ORJSONResponse(
+                {"detail": "Server is busy, please retry later"},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(group)
+
+
+READ_METHODS = frozenset({"GET", "HEAD"})
+
+ADMISSION_RULES = [
+    AdmissionRule("analytics", READ_METHODS, re.compile(r"/api/post/analytics|/api/users/[^/]+/activity")),
+    AdmissionRule("reads", READ_METHODS, re.compile(r"/api/(post|users)/|/authenticated-route")),
+    AdmissionRule("writes", None, re.compile(r"/api/(post|users)/|/auth/")),
+]
+
+admission_controller = AdmissionController(
+    max_concurrency=settings.admission_max_concurrency,
+    groups=[
+        AdmissionGroup("reads", settings.admission_read_limit, priority=0),
+        AdmissionGroup("writes", settings.admission_write_limit, priority=1),
+        AdmissionGroup("analytics", settings.admission_analytics_limit, priority=2),
+    ],
+    queue_size=settings.admission_queue_size,
+    queue_timeout=settings.admission_queue_timeout,
+    aging=settings.admission_priority_aging,
+)
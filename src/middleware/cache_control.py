@@ -0,0 +1,44 @@
+from starlette.datastructures import Headers, MutableHeaders
+
+from src.monitoring.instrumentation import route_name
+
+PRIVATE_POLICY = "private, no-cache"
+CACHEABLE_STATUSES = {200, 203, 204, 206, 300, 301, 304, 404, 405, 410, 414, 501}
+# A shared cache must not keep serving an error, e.g. a 404 for a post created right after.
+PUBLIC_STATUSES = {200, 304}
+
+
+class CacheControlMiddleware:
+    """
+    ASGI middleware setting Cache-Control on GET and HEAD responses by route.
+
+    Successful responses of the routes listed in `policies` get their policy, keyed
+    by the route path template. Their other responses, and the responses to requests
+    with an Authorization header, get "private, no-cache". A Cache-Control set by the
+    endpoint itself is kept.
+    """
+
+    def __init__(self, app, policies: dict[str, str]):
+        self.app = app
+        self.policies = policies
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+        authenticated = "authorization" in Headers(scope=scope)
+
+        async def send_with_cache_control(message):
+            if message["type"] == "http.response.start" and message["status"] in CACHEABLE_STATUSES:
+                headers = MutableHeaders(raw=message["headers"])
+                if "cache-control" not in headers:
+                    policy = self.policies.get(route_name(scope))
+                    if policy is not None and message["status"] not in PUBLIC_STATUSES:
+                        policy = PRIVATE_POLICY
+                    if policy is None and authenticated:
+                        policy = PRIVATE_POLICY
+                    if policy is not None:
+                        headers["Cache-Control"] = policy
+            await send(message)
+
+        await self.app(scope, receive, send_with_cache_control)
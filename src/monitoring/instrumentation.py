@@ -0,0 +1,113 @@
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+
+from src.config import settings
+from src.monitoring.metrics import registry
+
+logger = logging.getLogger(__name__)
+
+registry.counter("http_requests_total", "HTTP requests by route, method and status code.")
+registry.histogram("http_request_duration_seconds", "HTTP request duration by route.")
+registry.counter("db_queries_total", "SQL statements executed, by route.")
+registry.counter("db_query_duration_seconds_total", "Time spent executing SQL statements, by route.")
+registry.counter("db_rows_total", "Rows returned or affected by SQL statements, by route.")
+registry.counter("db_slow_queries_total", "SQL statements slower than SLOW_QUERY_THRESHOLD_MS, by route.")
+
+
+@dataclass(slots=True)
+class RequestQueryStats:
+    scope: dict = field(repr=False)
+    queries: int = 0
+    rows: int = 0
+    db_time: float = 0.0
+
+
+_current_stats: ContextVar[RequestQueryStats | None] = ContextVar("current_query_stats", default=None)
+
+
+def route_name(scope: dict | None) -> str:
+    route = scope.get("route") if scope else None
+    return getattr(route, "path", None) or "unmatched"
+
+
+# The start time is kept on the execution context, which is dropped with a failed statement,
+# so no state is left on the connection when after_cursor_execute is never called.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context._query_started
+    stats = _current_stats.get()
+    route = route_name(stats.scope) if stats else "background"
+    rows = max(cursor.rowcount, 0)
+    if stats is not None:
+        stats.queries += 1
+        stats.rows += rows
+        stats.db_time += elapsed
+
+    registry.inc("db_queries_total", route=route)
+    registry.inc("db_query_duration_seconds_total", elapsed, route=route)
+    registry.inc("db_rows_total", rows, route=route)
+    if 0 < settings.slow_query_threshold_ms <= elapsed * 1000:
+        registry.inc("db_slow_queries_total", route=route)
+        logger.warning("Slow query on %s took %.1f ms: %s", route, elapsed * 1000, statement)
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """
+    Count and time every statement executed by the engine, attributing it to the current request.
+
+    :param engine: AsyncEngine: The engine to instrument.
+    :return: None
+    """
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware collecting per-request SQL statistics.
+
+    Query count, rows and DB time are sent in the Server-Timing header and
+    aggregated per route in the metrics registry.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats(scope=scope)
+        token = _current_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_with_timing(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(raw=message["headers"])
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries, {stats.rows} rows", '
+                    f'app;dur={(time.perf_counter() - started) * 1000:.2f}',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            route = route_name(scope)
+            registry.inc("http_requests_total", route=route, method=scope["method"], status=status_code)
+            registry.observe("http_request_duration_seconds", time.perf_counter() - started, route=route)
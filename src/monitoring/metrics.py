@@ -0,0 +1,113 @@
+from collections import defaultdict
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class MetricsRegistry:
+    """
+    In-process counters and histograms rendered in the Prometheus text exposition format.
+
+    Metrics are per worker process; scrape every worker or aggregate upstream.
+    """
+
+    def __init__(self):
+        self._meta: dict[str, tuple[str, str]] = {}
+        self._counters: dict[str, dict[tuple, float]] = defaultdict(lambda: defaultdict(float))
+        self._histograms: dict[str, dict[tuple, list]] = defaultdict(dict)
+        self._buckets: dict[str, tuple[float, ...]] = {}
+
+    def counter(self, name: str, help_text: str) -> None:
+        self._meta[name] = ("counter", help_text)
+
+    def histogram(self, name: str, help_text: str, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self._meta[name] = ("histogram", help_text)
+        self._buckets[name] = buckets
+
+    def inc(self, name: str, value: float = 1.0, **labels) -> None:
+        self._counters[name][tuple(labels.items())] += value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = tuple(labels.items())
+        series = self._histograms[name].get(key)
+        if series is None:
+            # one slot per bucket plus +Inf, then sum
+            series = self._histograms[name][key] = [0] * (len(self._buckets[name]) + 1) + [0.0]
+        for index, bound in enumerate(self._buckets[name]):
+            if value <= bound:
+                series[index] += 1
+                break
+        else:
+            series[-2] += 1
+        series[-1] += value
+
+    def render(self) -> str:
+        lines = []
+        for name, (kind, help_text) in self._meta.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            if kind == "counter":
+                for key, value in self._counters[name].items():
+                    lines.append(f"{name}{_format_labels(dict(key))} {value}")
+                continue
+            for key, series in self._histograms[name].items():
+                labels = dict(key)
+                cumulative = 0
+                for bound, count in zip(self._buckets[name] + ("+Inf",), series):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels({**labels, 'le': bound})} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {series[-1]}")
+                lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+
+def render_stats(prefix: str, stats: dict, **labels) -> str:
+    """
+    Render the numeric values of a stats dict as gauges named <prefix>_<key>.
+
+    :param prefix: str: The metric name prefix.
+    :param stats: dict: The stats, non numeric values are skipped.
+    :param labels: The labels added to every sample.
+    :return: str: The rendered samples.
+    """
+    lines = []
+    for key, value in stats.items():
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        lines.append(f"# TYPE {prefix}_{key} gauge")
+        lines.append(f"{prefix}_{key}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+def render_labeled_stats(prefix: str, label: str, stats_by_name: dict[str, dict]) -> str:
+    """
+    Render several stats dicts with the same keys as one gauge family per key.
+
+    :param prefix: str: The metric name prefix.
+    :param label: str: The label telling the dicts apart, set to their name.
+    :param stats_by_name: dict[str, dict]: The stats per name, non numeric values are skipped.
+    :return: str: The rendered samples.
+    """
+    families = {}
+    for name, stats in stats_by_name.items():
+        for key, value in stats.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            families.setdefault(key, []).append(f"{prefix}_{key}{_format_labels({label: name})} {value}")
+    lines = []
+    for key, samples in families.items():
+        lines.append(f"# TYPE {prefix}_{key} gauge")
+        lines.extend(samples)
+    return "\n".join(lines) + "\n" if lines else ""
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,55 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.config import settings
+from src.database.database import engine, replica_set
+from src.middleware.admission import admission_controller
+from src.monitoring.metrics import registry, render_stats, render_labeled_stats
+from src.posts.cache import post_cache
+from src.posts.like_queue import like_queue
+
+monitoring_router = APIRouter(prefix="/stats", tags=["monitoring"])
+metrics_router = APIRouter(tags=["monitoring"])
+
+
+@monitoring_router.get("/cache")
+async def get_cache_stats():
+    return {"posts": post_cache.stats()}
+
+
+@monitoring_router.get("/likes")
+async def get_like_queue_stats():
+    return {"write_behind": settings.like_write_behind, "queue": like_queue.stats()}
+
+
+@monitoring_router.get("/admission")
+async def get_admission_stats():
+    return {
+        "enabled": settings.admission_enabled,
+        **admission_controller.stats(),
+        "groups": admission_controller.group_stats(),
+    }
+
+
+@monitoring_router.get("/pool")
+async def get_pool_stats():
+    pools = {"primary": engine.pool.stats()}
+    for name, replica in replica_set.engines.items():
+        pools[name] = replica.pool.stats()
+    return {**pools, "replica_set": replica_set.stats()}
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    pools = {"primary": engine.pool.stats()}
+    for name, replica in replica_set.engines.items():
+        pools[name] = replica.pool.stats()
+    return (
+        registry.render()
+        + render_labeled_stats("db_pool", "engine", pools)
+        + render_stats("db_replicas", replica_set.stats())
+        + render_stats("post_cache", post_cache.stats())
+        + render_stats("like_queue", like_queue.stats())
+        + render_stats("admission", admission_controller.stats())
+        + render_labeled_stats("admission_group", "group", admission_controller.group_stats())
+    )
@@ -0,0 +1,104 @@
+import uuid
+from datetime import datetime
+
+import orjson
+from sqlalchemy import Row
+
+from src.cache.backends import CacheBackend, InMemoryCache, RedisCache
+from src.config import settings
+from src.database.models import Post
+
+POST_CACHE_FIELDS = ("id", "owner_id", "text", "created_at", "updated_at", "like_count", "version_at")
+
+
+class PostCache:
+    """
+    Read-through cache of post rows keyed by post ID.
+
+    Only column values are cached; PostQuery.read rebuilds a session bound Post from them.
+    """
+
+    def __init__(self, backend: CacheBackend | None, ttl: float):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _key(post_id: int) -> str:
+        return f"post:{post_id}"
+
+    async def get(self, post_id: int) -> dict | None:
+        """
+        Get the cached column values of a post.
+
+        :param post_id: int: The ID of the post.
+        :return: dict | None: The column values of the post, or None on a cache miss.
+        """
+        if self.backend is None:
+            return None
+        raw = await self.backend.get(self._key(post_id))
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        data = orjson.loads(raw)
+        data["owner_id"] = uuid.UUID(data["owner_id"])
+        data["created_at"] = datetime.fromisoformat(data["created_at"])
+        data["version_at"] = datetime.fromisoformat(data["version_at"])
+        if data["updated_at"] is not None:
+            data["updated_at"] = datetime.fromisoformat(data["updated_at"])
+        return data
+
+    async def set(self, post: Post | Row) -> None:
+        """
+        Store the column values of a post.
+
+        :param post: Post | Row: The post, or its POST_COLUMNS and version_at row, loaded from the database.
+        :return: None.
+        """
+        if self.backend is None:
+            return
+        data = {field: getattr(post, field) for field in POST_CACHE_FIELDS}
+        await self.backend.set(self._key(post.id), orjson.dumps(data), self.ttl)
+
+    async def invalidate(self, *post_ids: int) -> None:
+        """
+        Drop cached posts after they were changed or deleted.
+
+        :param post_ids: int: The IDs of the changed posts.
+        :return: None.
+        """
+        if self.backend is None:
+            return
+        for post_id in post_ids:
+            await self.backend.delete(self._key(post_id))
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            **(self.backend.stats() if self.backend else {}),
+        }
+
+
+def build_post_cache() -> PostCache:
+    if settings.post_cache_backend == "memory":
+        backend = InMemoryCache(max_size=settings.post_cache_max_size)
+    elif settings.post_cache_backend == "redis":
+        backend = RedisCache.from_url(settings.redis_url)
+    elif settings.post_cache_backend == "none":
+        backend = None
+    else:
+        raise ValueError(f"Unknown post cache backend: {settings.post_cache_backend}")
+    return PostCache(backend, ttl=settings.post_cache_ttl)
+
+
+post_cache = build_post_cache()
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import uuid
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import datetime
+
+from src.config import settings
+from src.database.database import async_session_maker
+from src.posts.repository import PostQuery
+
+logger = logging.getLogger(__name__)
+
+LIKE = "like"
+UNLIKE = "unlike"
+
+
+@dataclass(slots=True)
+class PendingLike:
+    action: str
+    user_id: uuid.UUID
+    post_id: int
+    accepted_at: datetime
+    future: asyncio.Future | None
+    attempts: int = 0
+
+
+class LikeQueue:
+    """
+    Write-behind buffer for likes and unlikes, applied in batches by a background worker.
+
+    A batch is flushed every `interval` seconds, or as soon as `batch_size` operations
+    are pending. A longer backlog is flushed in several batches of at most
+    `batch_size`, each in its own transaction. Within a batch the operations on the
+    same (user, post) pair are coalesced: repeated likes or unlikes count once, and a
+    like followed by an unlike only deletes a like that already existed, the new one
+    is never inserted.
+
+    A batch that fails is put back at the head of the queue and retried on the next
+    interval, up to `max_retries` times, before its operations are dropped.
+
+    With `wait_for_flush`, submit() returns a future resolved once the batch is
+    committed, so responses keep their meaning and only wait up to one interval.
+    Otherwise operations are acknowledged when queued and the ones still pending
+    are lost if the process dies; they are flushed on a graceful shutdown.
+    """
+
+    def __init__(self, interval: float, batch_size: int, max_depth: int, wait_for_flush: bool, max_retries: int):
+        self.interval = interval
+        self.batch_size = batch_size
+        self.max_depth = max_depth
+        self.wait_for_flush = wait_for_flush
+        self.max_retries = max_retries
+        self._pending: list[PendingLike] = []
+        self._full = asyncio.Event()
+        self._flushing: asyncio.Future | None = None
+        self.accepted = 0
+        self.rejected = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.retried = 0
+        self.failed = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._pending)
+
+    def accepts(self) -> bool:
+        """
+        Tell whether there is room for one more operation, callers write synchronously otherwise.
+
+        :return: bool: False if max_depth operations are already pending.
+        """
+        if self.depth < self.max_depth:
+            return True
+        self.rejected += 1
+        return False
+
+    def submit(self, action: str, user_id: uuid.UUID, post_id: int) -> asyncio.Future | None:
+        """
+        Queue a like or an unlike.
+
+        :param action: str: LIKE or UNLIKE.
+        :param user_id: uuid.UUID: The ID of the user.
+        :param post_id: int: The ID of the post, which must exist.
+        :return: asyncio.Future | None: With wait_for_flush, a future resolved with the new number of likes,
+            or with None if the post was already liked (for an unlike, not liked). Otherwise None.
+        """
+        future = asyncio.get_running_loop().create_future() if self.wait_for_flush else None
+        self._pending.append(PendingLike(action, user_id, post_id, datetime.now(), future))
+        self.accepted += 1
+        if self.depth >= self.batch_size:
+            self._full.set()
+        return future
+
+    async def flush(self) -> int:
+        """
+        Apply up to `batch_size` pending operations, oldest first, in one transaction and resolve their futures.
+
+        If the transaction fails, the operations are queued again, the ones out of retries fail
+        their futures instead, and the error is raised.
+
+        :return: int: The number of operations flushed.
+        """
+        batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+        if not batch:
+            return 0
+
+        by_pair: dict[tuple[uuid.UUID, int], list[PendingLike]] = {}
+        for pending in batch:
+            by_pair.setdefault((pending.user_id, pending.post_id), []).append(pending)
+        likes, unlikes = {}, set()
+        for pair, operations in by_pair.items():
+            last = operations[-1]
+            if last.action == LIKE:
+                likes[pair] = last.accepted_at
+            else:
+                unlikes.add(pair)
+
+        try:
+            async with async_session_maker() as session:
+                liked, unliked, like_counts = await PostQuery.apply_like_batch(likes, unlikes, session)
+        except Exception as error:
+            retry = []
+            for pending in batch:
+                pending.attempts += 1
+                if pending.attempts <= self.max_retries:
+                    retry.append(pending)
+                    continue
+                self.failed += 1
+                if pending.future is not None and not pending.future.done():
+                    pending.future.set_exception(error)
+            self.retried += len(retry)
+            self._pending = retry + self._pending
+            raise
+        self.batches += 1
+        self.coalesced += len(batch) - len(by_pair)
+
+        for pair, operations in by_pair.items():
+            # The coalesced operation changed the database only if the pair was in the
+            # opposite state before the batch, which gives the state every operation saw.
+            if pair in likes:
+                liked_before = pair not in liked
+            else:
+                liked_before = pair in unliked
+            for pending in operations:
+                wants_liked = pending.action == LIKE
+                succeeded = wants_liked != liked_before
+                liked_before = wants_liked
+                if pending.future is not None and not pending.future.done():
+                    pending.future.set_result(like_counts.get(pair[1]) if succeeded else None)
+        return len(batch)
+
+    async def run(self) -> None:
+        """
+        Flush every `interval` seconds, or when a batch is full, until cancelled, then flush what is left.
+
+        A flush in progress is shielded from the cancellation, so a batch is never half applied.
+        After a failed flush the next attempt waits for the next interval.
+
+        :return: None.
+        """
+        try:
+            while True:
+                # Unlike wait_for, wait never swallows a cancellation arriving as the event is set.
+                full = asyncio.ensure_future(self._full.wait())
+                try:
+                    await asyncio.wait([full], timeout=self.interval)
+                finally:
+                    full.cancel()
+                self._full.clear()
+                if not self._pending:
+                    continue
+                self._flushing = asyncio.ensure_future(self.flush())
+                try:
+                    await asyncio.shield(self._flushing)
+                except Exception:
+                    logger.exception("Failed to flush the like queue")
+                    continue
+                if self.depth >= self.batch_size:
+                    self._full.set()
+        except asyncio.CancelledError:
+            if self._flushing is not None:
+                with suppress(Exception):
+                    await self._flushing
+            # Each failure uses up a retry of the batch, so the drain ends even if the database is down.
+            while self._pending:
+                try:
+                    await self.flush()
+                except Exception:
+                    logger.exception("Failed to flush the like queue on shutdown")
+            raise
+
+    def stats(self) -> dict:
+        return {
+            "depth": self.depth,
+            "accepted": self.accepted,
+            "rejected": self.rejected,
+            "coalesced": self.coalesced,
+            "batches": self.batches,
+            "retried": self.retried,
+            "failed": self.failed,
+        }
+
+
+like_queue = LikeQueue(
+    interval=settings.like_batch_interval_ms / 1000,
+    batch_size=settings.like_batch_max_size,
+    max_depth=settings.like_queue_max_depth,
+    wait_for_flush=settings.like_wait_for_flush,
+    max_retries=settings.like_flush_max_retries,
+)
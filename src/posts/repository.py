@@ -1,8 +1,50 @@
-from sqlalchemy import select
+import math
+import random
+import uuid
+from collections import Counter
+from datetime import datetime, date
+from typing import Callable
+
+from sqlalchemy import (
+    select, tuple_, Select, Row, Integer, Float, DateTime, UUID, column, delete, insert, update, values, func, union,
+    or_, true, false, cast, literal, ColumnElement
+)
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.database.models import User, Post
+from sqlalchemy.orm import make_transient_to_detached
+from src.config import settings
+from src.database.database import is_replica_session
+from src.database.models import (
+    User, Post, PostScore, LikeDailyStats, association_table, like_keys_table, follows_table, timeline_table,
+    SEARCH_CONFIG, TRENDING_EPOCH
+)
+from src.posts.cache import post_cache
 from src.posts.schemas import PostSchemaUpdate
 
+# Columns of PostSchemaResponse, selected as plain rows by the list endpoints to skip ORM hydration.
+POST_COLUMNS = (Post.id, Post.owner_id, Post.text, Post.created_at, Post.updated_at, Post.like_count)
+# Heat under this counts as none, and 2 ** -1000 is the smallest weight computed, well above the float8 underflow.
+MIN_HEAT = 1e-300
+MIN_HEAT_EXPONENT = -1000.0
+
+
+def split_page(rows: list[Row], limit: int, key: Callable[[Row], tuple]) -> tuple[list[Row], tuple | None]:
+    """
+    Cut a page fetched with one extra row down to its size and work out the position of the next one.
+
+    :param rows: list[Row]: Up to limit + 1 rows in keyset order.
+    :param limit: int: The page size.
+    :param key: Callable[[Row], tuple]: Builds the keyset position from the last row of the page.
+
+    :return: tuple[list[Row], tuple | None]: The rows of the page and the keyset position of the
+        next page, or None if this is the last page.
+
+    """
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, key(rows[-1])
+
 
 class PostQuery:
     @staticmethod
@@ -21,13 +63,172 @@ class PostQuery:
         """
         post = Post(text=text, owner_id=user.id)
         session.add(post)
+        await session.flush()
+        await TimelineQuery.fan_out([post.id], session)
         await session.commit()
         return post
 
+    @staticmethod
+    async def create_many(
+            texts: list[str], user: User, session: AsyncSession
+    ) -> list[Row]:
+        """
+        Create several posts of one user with a batched INSERT ... RETURNING.
+
+        Postgres does not tell in which order the rows of a multi-row INSERT get their
+        IDs, so the rows are matched back to their parameters by sort_by_parameter_order.
+
+        :param texts: list[str]: The text contents of the posts.
+        :param user: User: The user who is the owner of the posts.
+        :param session: AsyncSession: The database session.
+
+        :return: list[Row]: The column values of the created posts, in the order of `texts`.
+
+        """
+        if not texts:
+            return []
+        stmt = insert(Post).returning(*POST_COLUMNS, sort_by_parameter_order=True)
+        rows = (await session.execute(stmt, [{"text": text, "owner_id": user.id} for text in texts])).all()
+        await TimelineQuery.fan_out([row.id for row in rows], session)
+        await session.commit()
+        return list(rows)
+
+    @staticmethod
+    def feed_statement(cursor: tuple[datetime, int] | None = None, limit: int | None = None) -> Select:
+        """
+        Build the keyset-paginated statement for the global feed.
+
+        Posts are ordered by (created_at, id) descending, which is served by the
+        ix_posts_created_at_id index, and selected as POST_COLUMNS rows.
+
+        :param cursor: tuple[datetime, int] | None: The (created_at, id) of the last post already seen.
+        :param limit: int | None: The maximum number of posts to select, None for no limit.
+
+        :return: Select: The statement selecting the next posts of the feed.
+
+        """
+        stmt = select(*POST_COLUMNS).order_by(Post.created_at.desc(), Post.id.desc())
+        if cursor is not None:
+            stmt = stmt.where(tuple_(Post.created_at, Post.id) < tuple_(*cursor))
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt
+
+    @staticmethod
+    async def read_page(
+            session: AsyncSession, limit: int, cursor: tuple[datetime, int] | None = None
+    ) -> tuple[list[Row], tuple[datetime, int] | None]:
+        """
+        Read one page of the global feed.
+
+        :param session: AsyncSession: The database session.
+        :param limit: int: The page size.
+        :param cursor: tuple[datetime, int] | None: The (created_at, id) of the last post already seen.
+
+        :return: tuple[list[Row], tuple[datetime, int] | None]: The post rows of the page and the
+            keyset position of the next page, or None if this is the last page.
+
+        """
+        result = await session.execute(PostQuery.feed_statement(cursor, limit + 1))
+        return split_page(list(result.all()), limit, lambda post: (post.created_at, post.id))
+
+    @staticmethod
+    def search_statement(query: str, limit: int, cursor: tuple[float, int] | None = None) -> Select:
+        """
+        Build the ranked, keyset-paginated full-text search statement.
+
+        Matches are found through the GIN index on posts.search_vector, then ordered
+        by (rank, id) descending. The query uses the websearch syntax: quoted phrases,
+        `or` and `-excluded` words.
+
+        :param query: str: The search query as typed by the client.
+        :param limit: int: The maximum number of posts to select.
+        :param cursor: tuple[float, int] | None: The (rank, id) of the last post already seen.
+
+        :return: Select: The statement selecting POST_COLUMNS rows with an extra rank column.
+
+        """
+        ts_query = func.websearch_to_tsquery(SEARCH_CONFIG, query)
+        rank = func.ts_rank_cd(Post.search_vector, ts_query)
+        stmt = (
+            select(*POST_COLUMNS, rank.label("rank"))
+            .where(Post.search_vector.bool_op("@@")(ts_query))
+            .order_by(rank.desc(), Post.id.desc())
+            .limit(limit)
+        )
+        if cursor is not None:
+            stmt = stmt.where(tuple_(rank, Post.id) < tuple_(*cursor))
+        return stmt
+
+    @staticmethod
+    async def search_page(
+            query: str, session: AsyncSession, limit: int, cursor: tuple[float, int] | None = None
+    ) -> tuple[list[Row], tuple[float, int] | None]:
+        """
+        Read one page of full-text search results.
+
+        :param query: str: The search query.
+        :param session: AsyncSession: The database session.
+        :param limit: int: The page size.
+        :param cursor: tuple[float, int] | None: The (rank, id) of the last post already seen.
+
+        :return: tuple[list[Row], tuple[float, int] | None]: The ranked post rows of the page and the
+            keyset position of the next page, or None if this is the last page.
+
+        """
+        result = await session.execute(PostQuery.search_statement(query, limit + 1, cursor))
+        return split_page(list(result.all()), limit, lambda post: (post.rank, post.id))
+
+    @staticmethod
+    def trending_statement(limit: int) -> Select:
+        """
+        Build the statement selecting the hottest posts.
+
+        Ordering by hot_rank is ordering by the current hot score, so this reads
+        `limit` entries of ix_post_scores_hot_rank_post_id whatever the size of the
+        table. Posts whose score decayed under trending_min_score are left out.
+
+        :param limit: int: The maximum number of posts to select.
+        :return: Select: The statement selecting POST_COLUMNS rows with an extra hot_score column.
+        """
+        now = PostQuery.trending_units()
+        return (
+            select(*POST_COLUMNS, func.power(2.0, PostScore.hot_rank - now).label("hot_score"))
+            .join(PostScore, PostScore.post_id == Post.id)
+            .where(PostScore.hot_rank >= now + math.log2(settings.trending_min_score))
+            .order_by(PostScore.hot_rank.desc(), PostScore.post_id.desc())
+            .limit(limit)
+        )
+
+    @staticmethod
+    async def read_values(post_id: int, session: AsyncSession) -> dict | None:
+        """
+        Read the column values of a post through the post cache, without building an ORM object.
+
+        :param post_id: int: The ID of the post to retrieve.
+        :param session: AsyncSession: The database session.
+
+        :return: dict | None: The POST_COLUMNS values and the version_at of the post if found, otherwise None.
+
+        """
+        cached = await post_cache.get(post_id)
+        if cached is not None:
+            return cached
+        row = (await session.execute(select(*POST_COLUMNS, Post.version_at).where(Post.id == post_id))).one_or_none()
+        if row is None:
+            return None
+        # A lagging replica may return a row older than the last invalidation, it must not be cached.
+        if not is_replica_session(session):
+            await post_cache.set(row)
+        return row._asdict()
+
     @staticmethod
     async def read(post_id: int, session: AsyncSession) -> Post | None:
         """
-        Read a post from the database.
+        Read a post through the post cache, falling back to the database.
+
+        A cached post is merged into the session without a query, so it can be
+        updated or deleted like a freshly loaded one.
 
         :param post_id: int: The ID of the post to retrieve.
         :param session: AsyncSession: The database session.
@@ -35,9 +236,61 @@ class PostQuery:
         :return: Post | None: The post object if found, otherwise None.
 
         """
+        cached = await post_cache.get(post_id)
+        if cached is not None:
+            post = Post(**cached)
+            make_transient_to_detached(post)
+            return await session.merge(post, load=False)
+
         stmt = select(Post).where(Post.id == post_id)
         post = await session.execute(stmt)
-        return post.scalars().unique().one_or_none()
+        post = post.scalars().unique().one_or_none()
+        if post is not None and not is_replica_session(session):
+            await post_cache.set(post)
+        return post
+
+    @staticmethod
+    async def read_by_owner(
+            owner_id: uuid.UUID,
+            session: AsyncSession,
+            limit: int,
+            cursor: tuple[datetime, int] | None = None,
+            viewer_id: uuid.UUID | None = None,
+    ) -> tuple[list[Row], tuple[datetime, int] | None]:
+        """
+        Read one page of the posts of a single user, newest first.
+
+        The page comes from the (owner_id, created_at, id) index in one query, which
+        also tells whether the viewer liked each post with an EXISTS on the
+        (user_id, post_id) primary key of user_post_likes.
+
+        :param owner_id: uuid.UUID: The ID of the user whose posts are retrieved.
+        :param session: AsyncSession: The database session.
+        :param limit: int: The page size.
+        :param cursor: tuple[datetime, int] | None: The (created_at, id) of the last post already seen.
+        :param viewer_id: uuid.UUID | None: The ID of the user reading the posts, None for anonymous reads.
+
+        :return: tuple[list[Row], tuple[datetime, int] | None]: POST_COLUMNS rows with an extra liked_by_me
+            column, and the keyset position of the next page, or None if this is the last page.
+
+        """
+        if viewer_id is None:
+            liked_by_me = false()
+        else:
+            liked_by_me = (
+                select(like_keys_table.c.post_id)
+                .where(like_keys_table.c.user_id == viewer_id, like_keys_table.c.post_id == Post.id)
+                .exists()
+            )
+        stmt = (
+            select(*POST_COLUMNS, liked_by_me.label("liked_by_me"))
+            .where(Post.owner_id == owner_id)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(limit + 1)
+        )
+        if cursor is not None:
+            stmt = stmt.where(tuple_(Post.created_at, Post.id) < tuple_(*cursor))
+        return split_page(list((await session.execute(stmt)).all()), limit, lambda post: (post.created_at, post.id))
 
     @staticmethod
     async def update(
@@ -58,6 +311,7 @@ class PostQuery:
         if post_data:
             post.text = post_data.text
         await session.commit()
+        await post_cache.invalidate(post.id)
         await session.refresh(post)
         return post
 
@@ -70,33 +324,552 @@ class PostQuery:
         :param session: AsyncSession: The database session.
         :return: None.
         """
+        await PostQuery._release_daily_likes(like_keys_table.c.post_id == post.id, session)
         await session.delete(post)
         await session.commit()
+        await post_cache.invalidate(post.id)
 
     @staticmethod
-    async def like_post(post: Post, user: User, session: AsyncSession) -> None:
+    async def like_post(post: Post, user: User, session: AsyncSession) -> int | None:
         """
         Like a post.
 
+        The duplicate check runs in the insert, so no liker list is loaded, and
+        like_count is incremented in the same transaction.
+
         :param post: Post: The post object to like.
         :param user: User: The user liking the post.
         :param session: AsyncSession: The database session.
 
-        :return: None.
+        :return: int | None: The new number of likes, or None if the user has already liked the post.
 
         """
-        user.liked_posts.append(post)
+        liked = await PostQuery._insert_likes({(user.id, post.id): None}, session)
+        if not liked:
+            await session.rollback()
+            return None
+        liked_at = liked[0].created_at
+
+        like_count = await PostQuery._add_likes(post.id, 1, 1.0, session)
+        await PostQuery._add_daily_likes(liked_at.date(), 1, session)
         await session.commit()
+        await post_cache.invalidate(post.id)
+        return like_count
 
     @staticmethod
-    async def unlike_post(post: Post, user: User, session: AsyncSession) -> None:
+    async def unlike_post(post: Post, user: User, session: AsyncSession) -> int | None:
         """
         Allow a user to unlike a post.
 
         :param post: Post: The post object to unlike.
         :param user: User: The user unliking the post.
         :param session: AsyncSession: The database session.
-        :return: None.
+        :return: int | None: The new number of likes, or None if the user has not liked the post.
         """
-        post.likers.remove(user)
+        await PostQuery._lock_posts({post.id}, session)
+        stmt = (
+            delete(like_keys_table)
+            .where(
+                like_keys_table.c.user_id == user.id,
+                like_keys_table.c.post_id == post.id,
+            )
+            .returning(like_keys_table.c.created_at)
+        )
+        unliked = (await session.execute(stmt)).first()
+        if unliked is None:
+            await session.rollback()
+            return None
+
+        like_count = await PostQuery._add_likes(post.id, -1, -PostQuery._like_heat(unliked.created_at), session)
+        if unliked.created_at is not None:
+            await PostQuery._add_daily_likes(unliked.created_at.date(), -1, session)
         await session.commit()
+        await post_cache.invalidate(post.id)
+        return like_count
+
+    @staticmethod
+    async def like_many(post_ids: list[int], user: User, session: AsyncSession) -> tuple[set[int], set[int]]:
+        """
+        Like several posts at once with a single multi-row INSERT.
+
+        :param post_ids: list[int]: The IDs of the posts to like, without duplicates.
+        :param user: User: The user liking the posts.
+        :param session: AsyncSession: The database session.
+
+        :return: tuple[set[int], set[int]]: The IDs of the posts liked now and of the posts that do not exist.
+            The remaining IDs were already liked by the user.
+
+        """
+        existing = set((await session.scalars(select(Post.id).where(Post.id.in_(post_ids)))).all())
+        missing = set(post_ids) - existing
+        if not existing:
+            return set(), missing
+
+        liked = await PostQuery._insert_likes({(user.id, post_id): None for post_id in existing}, session)
+        if not liked:
+            await session.rollback()
+            return set(), missing
+
+        await PostQuery._add_likes_bulk({row.post_id: 1 for row in liked}, session)
+        for day, total in sorted(Counter(row.created_at.date() for row in liked).items()):
+            await PostQuery._add_daily_likes(day, total, session)
+        await session.commit()
+        liked_ids = {row.post_id for row in liked}
+        await post_cache.invalidate(*liked_ids)
+        return liked_ids, missing
+
+    @staticmethod
+    async def apply_like_batch(
+            likes: dict[tuple[uuid.UUID, int], datetime],
+            unlikes: set[tuple[uuid.UUID, int]],
+            session: AsyncSession,
+    ) -> tuple[set[tuple[uuid.UUID, int]], set[tuple[uuid.UUID, int]], dict[int, int]]:
+        """
+        Apply a batch of likes and unlikes with one INSERT, one DELETE and one counter UPDATE.
+
+        Likes of posts or users deleted meanwhile are skipped, and already existing
+        likes are left untouched.
+
+        :param likes: dict[tuple[uuid.UUID, int], datetime]: The time of each like, by (user_id, post_id).
+        :param unlikes: set[tuple[uuid.UUID, int]]: The (user_id, post_id) pairs to unlike.
+        :param session: AsyncSession: The database session.
+
+        :return: tuple[set, set, dict[int, int]]: The pairs actually liked, the pairs actually unliked
+            and the new number of likes of every post of the batch.
+
+        """
+        liked, unliked = [], []
+        # Lock every post of the batch at once, so that rows are always locked in ID order.
+        await PostQuery._lock_posts({post_id for _, post_id in likes} | {post_id for _, post_id in unlikes}, session)
+        if likes:
+            liked = await PostQuery._insert_likes(likes, session)
+        if unlikes:
+            stmt = (
+                delete(like_keys_table)
+                .where(tuple_(like_keys_table.c.user_id, like_keys_table.c.post_id).in_(list(unlikes)))
+                .returning(like_keys_table.c.user_id, like_keys_table.c.post_id, like_keys_table.c.created_at)
+            )
+            unliked = (await session.execute(stmt)).all()
+
+        deltas, heat, per_day = Counter(), Counter(), Counter()
+        for row in liked:
+            deltas[row.post_id] += 1
+            heat[row.post_id] += 1.0
+            per_day[row.created_at.date()] += 1
+        for row in unliked:
+            deltas[row.post_id] -= 1
+            heat[row.post_id] -= PostQuery._like_heat(row.created_at)
+            if row.created_at is not None:
+                per_day[row.created_at.date()] -= 1
+        if deltas:
+            await PostQuery._add_likes_bulk(dict(deltas), session, heat=dict(heat))
+        for day, total in sorted(per_day.items()):
+            if total:
+                await PostQuery._add_daily_likes(day, total, session)
+
+        post_ids = {post_id for _, post_id in likes} | {post_id for _, post_id in unlikes}
+        like_counts = dict((await session.execute(select(Post.id, Post.like_count).where(Post.id.in_(post_ids)))).all())
+        await session.commit()
+        await post_cache.invalidate(*deltas)
+        return (
+            {(row.user_id, row.post_id) for row in liked},
+            {(row.user_id, row.post_id) for row in unliked},
+            like_counts,
+        )
+
+    @staticmethod
+    async def release_likes_of(user: User, session: AsyncSession) -> list[int]:
+        """
+        Decrement the like counters of every post and day liked by a user that is about to be deleted.
+
+        The likes themselves are removed by the ON DELETE CASCADE foreign key, so this
+        must run in the same transaction as the user deletion.
+
+        :param user: User: The user that is going to be deleted.
+        :param session: AsyncSession: The database session.
+        :return: list[int]: The IDs of the posts owned or liked by the user, to be invalidated after commit.
+        """
+        liked = select(like_keys_table.c.post_id).where(like_keys_table.c.user_id == user.id)
+        # Lock in ID order first, like every other transaction writing several posts.
+        await session.execute(
+            select(Post.id).where(Post.id.in_(liked)).order_by(Post.id).with_for_update(key_share=True)
+        )
+        stmt = (
+            update(Post)
+            .where(Post.id.in_(liked))
+            .values(like_count=Post.like_count - 1, updated_at=Post.updated_at)
+            .returning(Post.id)
+            .execution_options(synchronize_session=False)
+        )
+        affected = list((await session.scalars(stmt)).all())
+        owned = select(Post.id).where(Post.owner_id == user.id)
+        affected += (await session.scalars(owned)).all()
+
+        # The likes of the user and the likes of the posts of the user, deleted with them.
+        await PostQuery._release_daily_likes(
+            or_(like_keys_table.c.user_id == user.id, like_keys_table.c.post_id.in_(owned)), session
+        )
+        return affected
+
+    @staticmethod
+    async def _lock_posts(post_ids: set[int], session: AsyncSession) -> None:
+        """
+        Lock post rows until the end of the transaction, in ID order to avoid deadlocks.
+
+        Every transaction writing likes locks the posts it touches first, the
+        like counters are updated in the same transaction anyway. Row locks do not
+        use the shared lock table, so any number of posts can be locked at once.
+
+        :param post_ids: set[int]: The IDs of the posts, missing ones are ignored.
+        :param session: AsyncSession: The database session.
+        :return: None.
+        """
+        if not post_ids:
+            return
+        stmt = select(Post.id).where(Post.id.in_(sorted(post_ids))).order_by(Post.id).with_for_update(key_share=True)
+        await session.execute(stmt)
+
+    @staticmethod
+    async def _insert_likes(
+            likes: dict[tuple[uuid.UUID, int], datetime | None], session: AsyncSession
+    ) -> list[Row]:
+        """
+        Insert the likes that do not exist yet.
+
+        The duplicate check is the ON CONFLICT on the (user_id, post_id) primary key
+        of user_post_likes, a single index lookup whatever the number of partitions.
+        The inserted likes are then appended to the user_likes log in the same
+        statement. Likes of missing posts or users are skipped.
+
+        :param likes: dict[tuple[uuid.UUID, int], datetime | None]: The time of each like by (user_id, post_id),
+            None for the current time.
+        :param session: AsyncSession: The database session.
+        :return: list[Row]: The (user_id, post_id, created_at) rows of the inserted likes.
+        """
+        await PostQuery._lock_posts({post_id for _, post_id in likes}, session)
+        batch = values(
+            column("user_id", UUID), column("post_id", Integer), column("created_at", DateTime), name="batch"
+        ).data([(user_id, post_id, liked_at) for (user_id, post_id), liked_at in likes.items()])
+        source = (
+            # a VALUES column holding only NULLs is typed as text, hence the cast
+            select(batch.c.user_id, batch.c.post_id, func.coalesce(cast(batch.c.created_at, DateTime), func.now()))
+            .join(Post, Post.id == batch.c.post_id)
+            .join(User, User.id == batch.c.user_id)
+        )
+        inserted = (
+            pg_insert(like_keys_table)
+            .from_select(["user_id", "post_id", "created_at"], source)
+            .on_conflict_do_nothing()
+            .returning(like_keys_table.c.user_id, like_keys_table.c.post_id, like_keys_table.c.created_at)
+            .cte("inserted")
+        )
+        stmt = (
+            insert(association_table)
+            .add_cte(inserted)
+            .from_select(["user_id", "post_id", "created_at"], select(inserted))
+            .returning(association_table.c.user_id, association_table.c.post_id, association_table.c.created_at)
+        )
+        return list((await session.execute(stmt)).all())
+
+    @staticmethod
+    async def _add_likes(post_id: int, delta: int, heat: float, session: AsyncSession) -> int:
+        """
+        Shift the denormalized like counter and the trending score of a post.
+
+        updated_at is kept as is, it tracks edits of the post text only.
+
+        :param post_id: int: The ID of the post.
+        :param delta: int: The number of likes to add, negative to remove.
+        :param heat: float: The current hot score to add, negative to remove.
+        :param session: AsyncSession: The database session.
+        :return: int: The new number of likes.
+        """
+        stmt = (
+            update(Post)
+            .where(Post.id == post_id)
+            .values(like_count=Post.like_count + delta, updated_at=Post.updated_at)
+            .returning(Post.like_count)
+            .execution_options(synchronize_session=False)
+        )
+        like_count = await session.scalar(stmt)
+        await PostQuery._add_heat({post_id: heat}, session)
+        return like_count
+
+    @staticmethod
+    async def _add_likes_bulk(
+            deltas: dict[int, int], session: AsyncSession, heat: dict[int, float] | None = None
+    ) -> None:
+        """
+        Shift the like counters and trending scores of several posts with one UPDATE ... FROM (VALUES ...).
+
+        :param deltas: dict[int, int]: The number of likes to add per post ID, negative to remove.
+        :param session: AsyncSession: The database session.
+        :param heat: dict[int, float] | None: The current hot score to add per post ID,
+            the like delta when missing.
+        :return: None.
+        """
+        heat = heat or {}
+        changes = values(
+            column("post_id", Integer), column("delta", Integer), name="changes"
+        ).data(sorted(deltas.items()))
+        stmt = (
+            update(Post)
+            .where(Post.id == changes.c.post_id)
+            .values(like_count=Post.like_count + changes.c.delta, updated_at=Post.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(stmt)
+        heat = {post_id: heat.get(post_id, float(delta)) for post_id, delta in deltas.items()}
+        await PostQuery._add_heat(heat, session)
+
+    @staticmethod
+    async def _add_heat(heat: dict[int, float], session: AsyncSession) -> None:
+        """
+        Add to the current hot scores of several posts.
+
+        The stored hot_rank is turned into the current score, shifted and turned back
+        into a rank, all relative to now so that the powers stay in float range.
+        A post gets its post_scores row on its first like.
+
+        :param heat: dict[int, float]: The current hot score to add per post ID, negative to remove.
+        :param session: AsyncSession: The database session.
+        :return: None.
+        """
+        heat = {post_id: value for post_id, value in heat.items() if value}
+        if not heat:
+            return
+        now = PostQuery.trending_units()
+        changes = values(column("post_id", Integer), column("heat", Float), name="changes").data(sorted(heat.items()))
+        current = func.power(2.0, func.greatest(PostScore.hot_rank - now, MIN_HEAT_EXPONENT))
+        stmt = (
+            update(PostScore)
+            .where(PostScore.post_id == changes.c.post_id)
+            .values(hot_rank=now + func.ln(func.greatest(current + changes.c.heat, MIN_HEAT)) / math.log(2))
+            .returning(PostScore.post_id)
+            .execution_options(synchronize_session=False)
+        )
+        updated = set((await session.scalars(stmt)).all())
+        # The post rows are locked by the like transaction, no other one can insert these meanwhile.
+        new = [
+            {"post_id": post_id, "hot_rank": now + math.log2(value)}
+            for post_id, value in heat.items()
+            if post_id not in updated and value > 0
+        ]
+        if new:
+            await session.execute(pg_insert(PostScore).values(new).on_conflict_do_nothing())
+
+    @staticmethod
+    def trending_units(at: datetime | None = None) -> float:
+        """
+        Get the number of half-lives elapsed since TRENDING_EPOCH, the unit of hot_rank.
+
+        :param at: datetime | None: The time, now if None.
+        :return: float: The number of half-lives.
+        """
+        return ((at or datetime.now()) - TRENDING_EPOCH).total_seconds() / settings.trending_half_life_seconds
+
+    @staticmethod
+    def _like_heat(liked_at: datetime | None) -> float:
+        """
+        Get what a like made at `liked_at` still weighs in the current hot score.
+
+        :param liked_at: datetime | None: The time of the like.
+        :return: float: The decayed weight, 1.0 for a like made now.
+        """
+        if liked_at is None:
+            return 0.0
+        age = max(0.0, (datetime.now() - liked_at).total_seconds())
+        return 0.5 ** (age / settings.trending_half_life_seconds)
+
+    @staticmethod
+    async def _add_daily_likes(day: date, delta: int, session: AsyncSession) -> None:
+        """
+        Shift a like_daily_stats rollup row of a day, creating it if needed.
+
+        The count of a day is spread over like_stats_shards rows and the row is
+        picked at random, so concurrent likes of the same day do not all wait on one
+        row lock. A shard may go negative, only the sum of the day is meaningful.
+
+        :param day: date: The day the likes were made.
+        :param delta: int: The number of likes to add, negative to remove.
+        :param session: AsyncSession: The database session.
+        :return: None.
+        """
+        stmt = pg_insert(LikeDailyStats).values(day=day, shard=PostQuery._daily_stats_shard(), like_count=delta)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LikeDailyStats.day, LikeDailyStats.shard],
+            set_={"like_count": LikeDailyStats.like_count + stmt.excluded.like_count},
+        )
+        await session.execute(stmt)
+
+    @staticmethod
+    async def _release_daily_likes(condition: ColumnElement[bool], session: AsyncSession) -> None:
+        """
+        Subtract the likes about to be deleted from the like_daily_stats rollup, in day order.
+
+        :param condition: ColumnElement[bool]: The condition on user_post_likes selecting the likes.
+        :param session: AsyncSession: The database session.
+        :return: None.
+        """
+        liked_day = func.date(like_keys_table.c.created_at)
+        per_day = (
+            select(liked_day, literal(PostQuery._daily_stats_shard()), -func.count())
+            .where(condition, like_keys_table.c.created_at.is_not(None))
+            .group_by(liked_day)
+            .order_by(liked_day)
+        )
+        stmt = pg_insert(LikeDailyStats).from_select(["day", "shard", "like_count"], per_day)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[LikeDailyStats.day, LikeDailyStats.shard],
+            set_={"like_count": LikeDailyStats.like_count + stmt.excluded.like_count},
+        )
+        await session.execute(stmt)
+
+    @staticmethod
+    def _daily_stats_shard() -> int:
+        return random.randrange(settings.like_stats_shards)
+
+
+class TimelineQuery:
+    @staticmethod
+    async def fan_out(post_ids: list[int], session: AsyncSession) -> None:
+        """
+        Push new posts into the timelines of the followers of their owner.
+
+        Owners with timeline_fanout_threshold followers or more are skipped, their
+        posts are pulled when the timeline is read instead.
+
+        :param post_ids: list[int]: The IDs of the new posts, all owned by the same user.
+        :param session: AsyncSession: The database session.
+        :return: None.
+        """
+        if not post_ids:
+            return
+        source = (
+            select(follows_table.c.follower_id, Post.id, Post.created_at)
+            .select_from(Post)
+            .join(follows_table, follows_table.c.followee_id == Post.owner_id)
+            .join(User, User.id == Post.owner_id)
+            .where(Post.id.in_(post_ids), User.follower_count < settings.timeline_fanout_threshold)
+        )
+        stmt = (
+            pg_insert(timeline_table)
+            .from_select(["user_id", "post_id", "created_at"], source)
+            .on_conflict_do_nothing()
+        )
+        await session.execute(stmt)
+
+    @staticmethod
+    async def backfill(follower_id: uuid.UUID, followee_id: uuid.UUID, session: AsyncSession) -> None:
+        """
+        Copy the latest posts of a newly followed user into the timeline of the follower.
+
+        :param follower_id: uuid.UUID: The ID of the follower.
+        :param followee_id: uuid.UUID: The ID of the followed user.
+        :param session: AsyncSession: The database session.
+        :return: None.
+        """
+        source = (
+            select(follows_table.c.follower_id, Post.id, Post.created_at)
+            .select_from(Post)
+            .join(follows_table, follows_table.c.followee_id == Post.owner_id)
+            .join(User, User.id == Post.owner_id)
+            .where(
+                follows_table.c.follower_id == follower_id,
+                Post.owner_id == followee_id,
+                User.follower_count < settings.timeline_fanout_threshold,
+            )
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(settings.timeline_backfill_size)
+        )
+        stmt = (
+            pg_insert(timeline_table)
+            .from_select(["user_id", "post_id", "created_at"], source)
+            .on_conflict_do_nothing()
+        )
+        await session.execute(stmt)
+
+    @staticmethod
+    async def remove_posts_of(follower_id: uuid.UUID, followee_id: uuid.UUID, session: AsyncSession) -> None:
+        """
+        Remove the posts of an unfollowed user from the timeline of the former follower.
+
+        :param follower_id: uuid.UUID: The ID of the former follower.
+        :param followee_id: uuid.UUID: The ID of the unfollowed user.
+        :param session: AsyncSession: The database session.
+        :return: None.
+        """
+        stmt = delete(timeline_table).where(
+            timeline_table.c.user_id == follower_id,
+            timeline_table.c.post_id.in_(select(Post.id).where(Post.owner_id == followee_id)),
+        )
+        await session.execute(stmt)
+
+    @staticmethod
+    def timeline_statement(user_id: uuid.UUID, limit: int, cursor: tuple[datetime, int] | None = None) -> Select:
+        """
+        Build the keyset-paginated statement for the home timeline of a user.
+
+        Pushed posts come from timeline_entries. The posts of the user and of the heavy
+        accounts they follow are pulled from posts, at most `limit` per owner through
+        the (owner_id, created_at, id) index, and merged with the pushed ones. Both
+        sides read O(limit) rows, however many users are followed.
+
+        :param user_id: uuid.UUID: The ID of the user reading the timeline.
+        :param limit: int: The maximum number of posts to select.
+        :param cursor: tuple[datetime, int] | None: The (created_at, id) of the last post already seen.
+
+        :return: Select: The statement selecting the next posts of the timeline as POST_COLUMNS rows.
+
+        """
+        pushed = (
+            select(*POST_COLUMNS)
+            .join(timeline_table, timeline_table.c.post_id == Post.id)
+            .where(timeline_table.c.user_id == user_id)
+            .order_by(timeline_table.c.created_at.desc(), timeline_table.c.post_id.desc())
+            .limit(limit)
+        )
+        if cursor is not None:
+            pushed = pushed.where(tuple_(timeline_table.c.created_at, timeline_table.c.post_id) < tuple_(*cursor))
+
+        heavy = (
+            select(follows_table.c.followee_id)
+            .join(User, User.id == follows_table.c.followee_id)
+            .where(
+                follows_table.c.follower_id == user_id,
+                User.follower_count >= settings.timeline_fanout_threshold,
+            )
+        )
+        owners = select(User.id).where(or_(User.id == user_id, User.id.in_(heavy))).subquery("owners")
+        recent = (
+            select(*POST_COLUMNS)
+            .where(Post.owner_id == owners.c.id)
+            .order_by(Post.created_at.desc(), Post.id.desc())
+            .limit(limit)
+        )
+        if cursor is not None:
+            recent = recent.where(tuple_(Post.created_at, Post.id) < tuple_(*cursor))
+        recent = recent.lateral("recent")
+        pulled = select(recent).select_from(owners).join(recent, true())
+
+        merged = union(pushed, pulled).subquery("timeline")
+        return select(merged).order_by(merged.c.created_at.desc(), merged.c.id.desc()).limit(limit)
+
+    @staticmethod
+    async def read_page(
+            user_id: uuid.UUID, session: AsyncSession, limit: int, cursor: tuple[datetime, int] | None = None
+    ) -> tuple[list[Row], tuple[datetime, int] | None]:
+        """
+        Read one page of the home timeline of a user.
+
+        :param user_id: uuid.UUID: The ID of the user reading the timeline.
+        :param session: AsyncSession: The database session.
+        :param limit: int: The page size.
+        :param cursor: tuple[datetime, int] | None: The (created_at, id) of the last post already seen.
+
+        :return: tuple[list[Row], tuple[datetime, int] | None]: The post rows of the page and the
+            keyset position of the next page, or None if this is the last page.
+
+        """
+        result = await session.execute(TimelineQuery.timeline_statement(user_id, limit + 1, cursor))
+        return split_page(list(result.all()), limit, lambda post: (post.created_at, post.id))
@@ -1,35 +1,129 @@
 from datetime import datetime, date
-from typing import List
+from typing import List, AsyncIterator
 
-from fastapi import APIRouter, status, Form, Depends, HTTPException
-from sqlalchemy import select
+import orjson
+from fastapi import APIRouter, status, Form, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse, ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.database.database import get_async_session
-from src.database.models import User, Post
-from src.posts.repository import PostQuery
-from src.posts.schemas import PostSchemaResponse
-from src.posts.utils import get_post_or_raise_404, get_analytics_by_days
-from src.users.users import current_active_user
+from src.config import settings
+from src.database.database import get_async_session, get_read_session, read_session
+from src.database.models import Post
+from src.posts.like_queue import like_queue, LIKE, UNLIKE
+from src.posts.repository import PostQuery, TimelineQuery
+from src.posts.trending import trending_snapshot
+from src.posts.schemas import (
+    PostSchemaResponse,
+    PostSchemaCreate,
+    PostSearchResult,
+    PostListItem,
+    PostTrendingResult,
+    PostBulkResponse,
+    PostBulkItemResult,
+    LikeBulkResponse,
+    LikeBulkItemResult,
+)
+from src.posts.utils import (
+    get_post_or_raise_404,
+    get_analytics_by_days,
+    encode_cursor,
+    decode_cursor,
+    encode_search_cursor,
+    decode_search_cursor,
+    ensure_batch_size,
+    post_rows_response,
+    post_response,
+)
+from src.users.principal import Principal
+from src.users.users import current_active_principal
 
 posts_router = APIRouter(prefix="/post", tags=["posts"])
 
 
-@posts_router.get("/", response_model=List[PostSchemaResponse])
+@posts_router.get("/", response_model=List[PostListItem])
 async def get_all_user_posts(
-        current_user: User = Depends(current_active_user),
+        request: Request,
+        limit: int = Query(default=settings.posts_page_size, ge=1, le=settings.posts_max_page_size),
+        cursor: str | None = None,
+        current_user: Principal = Depends(current_active_principal),
         session: AsyncSession = Depends(get_async_session),
 ):
-    return current_user.posts
+    position = decode_cursor(cursor) if cursor else None
+    posts, next_position = await PostQuery.read_by_owner(
+        current_user.id, session, limit=limit, cursor=position, viewer_id=current_user.id
+    )
+    headers = {"X-Next-Cursor": encode_cursor(*next_position)} if next_position is not None else None
+    return post_rows_response(posts, headers=headers, request=request)
+
+
+async def stream_posts_ndjson(cursor: tuple[datetime, int] | None) -> AsyncIterator[bytes]:
+    """
+    Stream the feed as NDJSON, one post per line, starting after the given cursor.
+
+    The generator opens its own read session because request dependencies are
+    closed before a streaming response body is sent.
+
+    :param cursor: tuple[datetime, int] | None: The (created_at, id) of the last post already seen.
+    :return: AsyncIterator[bytes]: JSON encoded posts separated by new lines.
+    """
+    stmt = PostQuery.feed_statement(cursor).execution_options(yield_per=settings.posts_stream_chunk_size)
+    async with read_session() as session:
+        result = await session.stream(stmt)
+        async for row in result:
+            yield orjson.dumps(row._asdict()) + b"\n"
 
 
 @posts_router.get("/all", response_model=List[PostSchemaResponse])
 async def get_all_posts(
+        request: Request,
+        limit: int = Query(default=settings.posts_page_size, ge=1, le=settings.posts_max_page_size),
+        cursor: str | None = None,
+        stream: bool = False,
+        session: AsyncSession = Depends(get_read_session),
+):
+    position = decode_cursor(cursor) if cursor else None
+    if stream:
+        return StreamingResponse(stream_posts_ndjson(position), media_type="application/x-ndjson")
+
+    posts, next_position = await PostQuery.read_page(session, limit=limit, cursor=position)
+    headers = {"X-Next-Cursor": encode_cursor(*next_position)} if next_position is not None else None
+    return post_rows_response(posts, headers=headers, request=request)
+
+
+@posts_router.get("/timeline", response_model=List[PostSchemaResponse])
+async def get_timeline(
+        request: Request,
+        limit: int = Query(default=settings.posts_page_size, ge=1, le=settings.posts_max_page_size),
+        cursor: str | None = None,
+        user: Principal = Depends(current_active_principal),
         session: AsyncSession = Depends(get_async_session),
 ):
-    # Получите все посты для всех пользователей из базы данных
-    # Это просто пример, вам нужно адаптировать его к вашей логике
-    all_posts = await session.execute(select(Post).order_by(Post.created_at.desc()))
-    return all_posts.scalars().all()
+    position = decode_cursor(cursor) if cursor else None
+    posts, next_position = await TimelineQuery.read_page(user.id, session, limit=limit, cursor=position)
+    headers = {"X-Next-Cursor": encode_cursor(*next_position)} if next_position is not None else None
+    return post_rows_response(posts, headers=headers, request=request)
+
+
+@posts_router.get("/search", response_model=List[PostSearchResult])
+async def search_posts(
+        request: Request,
+        q: str = Query(min_length=1, max_length=256),
+        limit: int = Query(default=settings.posts_page_size, ge=1, le=settings.posts_max_page_size),
+        cursor: str | None = None,
+        session: AsyncSession = Depends(get_read_session),
+):
+    position = decode_search_cursor(cursor) if cursor else None
+    posts, next_position = await PostQuery.search_page(q, session, limit=limit, cursor=position)
+    headers = {"X-Next-Cursor": encode_search_cursor(*next_position)} if next_position is not None else None
+    return post_rows_response(posts, headers=headers, request=request)
+
+
+@posts_router.get("/trending", response_model=List[PostTrendingResult])
+async def get_trending_posts(
+        request: Request,
+        limit: int = Query(default=20, ge=1, le=settings.trending_max_size),
+        session: AsyncSession = Depends(get_read_session),
+):
+    return post_rows_response(await trending_snapshot.top(limit, session), request=request)
 
 
 @posts_router.post(
@@ -37,73 +131,136 @@ async def get_all_posts(
 )
 async def create_post(
         text: str = Form(...),
-        user: User = Depends(current_active_user),
+        user: Principal = Depends(current_active_principal),
         session: AsyncSession = Depends(get_async_session),
 ):
     post = await PostQuery.create(text=text, user=user, session=session)
     return post
 
 
+@posts_router.post("/bulk", response_model=PostBulkResponse, status_code=status.HTTP_201_CREATED)
+async def create_posts_bulk(
+        posts: List[PostSchemaCreate],
+        response: Response,
+        user: Principal = Depends(current_active_principal),
+        session: AsyncSession = Depends(get_async_session),
+):
+    ensure_batch_size(len(posts))
+    max_length = Post.text.type.length
+    results, texts, indexes = [], [], []
+    for index, post in enumerate(posts):
+        if len(post.text) > max_length:
+            results.append(
+                PostBulkItemResult(index=index, status="error", detail=f"Text is longer than {max_length} characters")
+            )
+        else:
+            texts.append(post.text)
+            indexes.append(index)
+
+    rows = await PostQuery.create_many(texts=texts, user=user, session=session)
+    for index, row in zip(indexes, rows):
+        results.append(
+            PostBulkItemResult(index=index, status="created", post=PostSchemaResponse.model_validate(row._mapping))
+        )
+    results.sort(key=lambda result: result.index)
+    if not rows:
+        # Nothing was created, every item failed.
+        response.status_code = status.HTTP_200_OK
+    return PostBulkResponse(created=len(rows), results=results)
+
+
+@posts_router.post("/likes/bulk", response_model=LikeBulkResponse, status_code=status.HTTP_200_OK)
+async def like_posts_bulk(
+        post_ids: List[int],
+        user: Principal = Depends(current_active_principal),
+        session: AsyncSession = Depends(get_async_session),
+):
+    ensure_batch_size(len(post_ids))
+    unique_ids = list(dict.fromkeys(post_ids))
+    liked, missing = await PostQuery.like_many(post_ids=unique_ids, user=user, session=session)
+
+    results, seen = [], set()
+    for index, post_id in enumerate(post_ids):
+        if post_id in seen:
+            item_status = "duplicate"
+        elif post_id in missing:
+            item_status = "not_found"
+        elif post_id in liked:
+            item_status = "liked"
+        else:
+            item_status = "already_liked"
+        seen.add(post_id)
+        results.append(LikeBulkItemResult(index=index, post_id=post_id, status=item_status))
+    return LikeBulkResponse(liked=len(liked), results=results)
+
+
 @posts_router.get("/{post_id}", response_model=PostSchemaResponse)
 async def get_post(
         post_id: int,
-        user: User = Depends(current_active_user),
-        session: AsyncSession = Depends(get_async_session)):
-    post = await PostQuery.read(post_id, session)
+        request: Request,
+        session: AsyncSession = Depends(get_read_session)):
+    post = await PostQuery.read_values(post_id, session)
     if not post:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Post not found!"
         )
-    return post
+    return post_response(post, request)
 
 
 @posts_router.post("/{post_id}/like", response_model=None, status_code=status.HTTP_200_OK)
 async def like_post(
         post_id: int,
-        user: User = Depends(current_active_user),
+        user: Principal = Depends(current_active_principal),
         session: AsyncSession = Depends(get_async_session),
 ):
-    try:
-        post = await get_post_or_raise_404(post_id=post_id, session=session)
-        if user in post.likers:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="You have already liked this post",
-            )
-
-        await PostQuery.like_post(post=post, user=user, session=session)
-        return {"message": "Post liked successfully", "total_likes": len(post.likers)}
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    post = await get_post_or_raise_404(post_id=post_id, session=session)
+    if settings.like_write_behind and like_queue.accepts():
+        future = like_queue.submit(LIKE, user.id, post.id)
+        # Give the connection back while waiting, the flush needs one from the same pool.
+        await session.close()
+        if future is None:
+            return ORJSONResponse({"message": "Post like accepted"}, status_code=status.HTTP_202_ACCEPTED)
+        total_likes = await future
+    else:
+        total_likes = await PostQuery.like_post(post=post, user=user, session=session)
+    if total_likes is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You have already liked this post",
+        )
+    return {"message": "Post liked successfully", "total_likes": total_likes}
 
 
 @posts_router.post("/{post_id}/unlike", response_model=None, status_code=status.HTTP_200_OK)
 async def unlike_post(
         post_id: int,
-        user: User = Depends(current_active_user),
+        user: Principal = Depends(current_active_principal),
         session: AsyncSession = Depends(get_async_session),
 ):
-    try:
-        post = await get_post_or_raise_404(post_id=post_id, session=session)
-        if user not in post.likers:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="You have not liked this post",
-            )
-
-        await PostQuery.unlike_post(post=post, user=user, session=session)
-
-        return {"message": "Post unliked successfully", "total_likes": len(post.likers)}
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    post = await get_post_or_raise_404(post_id=post_id, session=session)
+    if settings.like_write_behind and like_queue.accepts():
+        future = like_queue.submit(UNLIKE, user.id, post.id)
+        # Give the connection back while waiting, the flush needs one from the same pool.
+        await session.close()
+        if future is None:
+            return ORJSONResponse({"message": "Post unlike accepted"}, status_code=status.HTTP_202_ACCEPTED)
+        total_likes = await future
+    else:
+        total_likes = await PostQuery.unlike_post(post=post, user=user, session=session)
+    if total_likes is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You have not liked this post",
+        )
+    return {"message": "Post unliked successfully", "total_likes": total_likes}
 
 
 @posts_router.get("/analytics/")
 async def get_analytics(
         date_from: str,
         date_to: str,
-        session: AsyncSession = Depends(get_async_session),
-        user: User = Depends(current_active_user)
+        session: AsyncSession = Depends(get_read_session),
+        user: Principal = Depends(current_active_principal)
 
 ):
     if not date_from and not date_to:
@@ -118,7 +275,7 @@ async def get_analytics(
         if date_from and not date_to:
             print('TUTA')
             return await get_analytics_by_days(_date_from, date.today(), session)
-        _date_to = datetime.strptime(date_to, "%Y-%m-%d")
+        _date_to = datetime.strptime(date_to, "%Y-%m-%d").date()
     except ValueError:
         return {"error": "Invalid date_from format. Please use YYYY-MM-DD."}
     return await get_analytics_by_days(_date_from, _date_to, session)
@@ -20,14 +20,51 @@ class PostSchemaResponse(PostSchemaBase):
     owner_id: uuid.UUID
     created_at: datetime
     updated_at: datetime | None
+    like_count: int = 0
 
     class Config:
         from_attributes: True
 
 
+class PostListItem(PostSchemaResponse):
+    liked_by_me: bool
+
+
+class PostSearchResult(PostSchemaResponse):
+    rank: float
+
+
+class PostTrendingResult(PostSchemaResponse):
+    hot_score: float
+
+
 class PostSchemaDB(PostSchemaBase):
     id: int
     owner_id: uuid.UUID
     text: str
     created_at: datetime
     updated_at: datetime | None
+    like_count: int
+
+
+class PostBulkItemResult(BaseModel):
+    index: int
+    status: str
+    detail: str | None = None
+    post: PostSchemaResponse | None = None
+
+
+class PostBulkResponse(BaseModel):
+    created: int
+    results: list[PostBulkItemResult]
+
+
+class LikeBulkItemResult(BaseModel):
+    index: int
+    post_id: int
+    status: str
+
+
+class LikeBulkResponse(BaseModel):
+    liked: int
+    results: list[LikeBulkItemResult]
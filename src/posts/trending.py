@@ -0,0 +1,43 @@
+import asyncio
+import time
+
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.posts.repository import PostQuery
+
+
+class TrendingSnapshot:
+    """
+    Keeps the top `size` posts by hot_score in memory, reloaded at most every `ttl` seconds.
+
+    Serving a top-K request is a list slice; the reload reads `size` entries of the
+    ix_post_scores_hot_rank_post_id index.
+    """
+
+    def __init__(self, size: int, ttl: float):
+        self.size = size
+        self.ttl = ttl
+        self._rows: list[Row] = []
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def top(self, limit: int, session: AsyncSession) -> list[Row]:
+        """
+        Get the hottest posts, reloading the snapshot if it has expired.
+
+        :param limit: int: The number of posts to return, at most `size`.
+        :param session: AsyncSession: The database session used for a reload.
+        :return: list[Row]: POST_COLUMNS rows with an extra hot_score column, hottest first.
+        """
+        if time.monotonic() >= self._expires_at:
+            async with self._lock:
+                if time.monotonic() >= self._expires_at:
+                    result = await session.execute(PostQuery.trending_statement(self.size))
+                    self._rows = list(result.all())
+                    self._expires_at = time.monotonic() + self.ttl
+        return self._rows[:limit]
+
+
+trending_snapshot = TrendingSnapshot(size=settings.trending_max_size, ttl=settings.trending_snapshot_ttl)
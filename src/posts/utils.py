@@ -1,12 +1,176 @@
-from datetime import datetime
+import base64
+import binascii
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 
-from fastapi import HTTPException, status
-from sqlalchemy import select, func
+import orjson
+from fastapi import HTTPException, Request, status
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy import select, func, Row
 from sqlalchemy.ext.asyncio import AsyncSession
-from src.database.models import Post, association_table
+from src.config import settings
+from src.database.models import Post, LikeDailyStats
 from src.posts.repository import PostQuery
 
 
+def encode_cursor(created_at: datetime, post_id: int) -> str:
+    """
+    Encode the keyset position of a post into an opaque cursor string.
+
+    :param created_at: datetime: The creation time of the last post on the page.
+    :param post_id: int: The ID of the last post on the page.
+    :return: str: A URL-safe cursor that points right after the given post.
+    """
+    return _encode_position(created_at.isoformat(), post_id)
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor produced by encode_cursor back into its keyset position.
+
+    :param cursor: str: The cursor received from the client.
+    :return: tuple[datetime, int]: The creation time and ID of the last seen post.
+    """
+    return _decode_position(cursor, datetime.fromisoformat)
+
+
+def encode_search_cursor(rank: float, post_id: int) -> str:
+    """
+    Encode the (rank, id) keyset position of a search result into an opaque cursor string.
+
+    :param rank: float: The rank of the last post on the page.
+    :param post_id: int: The ID of the last post on the page.
+    :return: str: A URL-safe cursor that points right after the given post.
+    """
+    return _encode_position(repr(rank), post_id)
+
+
+def decode_search_cursor(cursor: str) -> tuple[float, int]:
+    """
+    Decode a cursor produced by encode_search_cursor back into its keyset position.
+
+    :param cursor: str: The cursor received from the client.
+    :return: tuple[float, int]: The rank and ID of the last seen post.
+    """
+    return _decode_position(cursor, float)
+
+
+def _encode_position(key: str, post_id: int) -> str:
+    raw = f"{key}|{post_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_position(cursor: str, parse_key):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        key, post_id = raw.split("|")
+        return parse_key(key), int(post_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def ensure_batch_size(size: int) -> None:
+    """
+    Reject bulk requests that are empty or larger than the configured maximum batch size.
+
+    :param size: int: The number of items in the request.
+    :return: None
+    """
+    if size == 0 or size > settings.bulk_max_batch_size:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"A batch must contain between 1 and {settings.bulk_max_batch_size} items",
+        )
+
+
+def post_rows_response(rows: list[Row], headers: dict | None = None, request: Request | None = None) -> Response:
+    """
+    Serialize post rows selected as POST_COLUMNS straight to JSON.
+
+    Rows already have the shape of PostSchemaResponse, so pydantic validation and
+    the default encoder are skipped; the route response_model only documents the body.
+    When the request is given, the page gets an ETag and a matching If-None-Match
+    is answered with 304 before the rows are serialized.
+
+    :param rows: list[Row]: The post rows.
+    :param headers: dict | None: Extra response headers.
+    :param request: Request | None: The request, to handle conditional requests.
+    :return: Response: The JSON array of posts, or an empty 304 response.
+    """
+    if request is None:
+        return ORJSONResponse([row._asdict() for row in rows], headers=headers)
+    headers = {**(headers or {}), "ETag": version_etag([row._mapping for row in rows])}
+    if is_not_modified(request, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return ORJSONResponse([row._asdict() for row in rows], headers=headers)
+
+
+def post_response(post: dict, request: Request) -> Response:
+    """
+    Serialize the column values of a post, answering conditional requests with 304.
+
+    Last-Modified is version_at, bumped by every change of the post, likes included,
+    unlike updated_at which only tracks edits of the text.
+
+    :param post: dict: The POST_COLUMNS values of the post and its version_at.
+    :param request: Request: The request.
+    :return: Response: The JSON post, or an empty 304 response.
+    """
+    body = {key: value for key, value in post.items() if key != "version_at"}
+    last_modified = post["version_at"]
+    headers = {
+        "ETag": version_etag([post]),
+        "Last-Modified": format_datetime(last_modified.replace(tzinfo=timezone.utc), usegmt=True),
+    }
+    if is_not_modified(request, headers["ETag"], last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return ORJSONResponse(body, headers=headers)
+
+
+def version_etag(posts: list) -> str:
+    """
+    Build a weak ETag from what identifies the version of each post.
+
+    The text is left out: editing it bumps updated_at. Extra columns of the rows,
+    like liked_by_me or rank, are part of the version.
+
+    :param posts: list: Mappings of post column values.
+    :return: str: The ETag header value.
+    """
+    versions = [[value for key, value in post.items() if key != "text"] for post in posts]
+    return f'W/"{hashlib.blake2b(orjson.dumps(versions), digest_size=16).hexdigest()}"'
+
+
+def is_not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    """
+    Evaluate If-None-Match, or If-Modified-Since when there is none, against the current version.
+
+    :param request: Request: The request carrying the conditional headers.
+    :param etag: str: The current ETag.
+    :param last_modified: datetime | None: The current modification time, naive UTC.
+    :return: bool: True if the client copy is still valid and a 304 can be sent.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison, as required for GET.
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+
 async def get_post_or_raise_404(post_id: int, session: AsyncSession) -> Post:
     """
     The get_post_or_raise_404 function is a helper function that will return the post with the
@@ -31,6 +195,8 @@ async def get_analytics_by_days(date_from: datetime.date, date_to: datetime.date
 
     This function takes in a start date (`date_from`) and an end date (`date_to`),
     and returns a dictionary with dates as keys and the corresponding count of associations for each date as values.
+    Counts are read from the like_daily_stats rollup, so the cost depends on the number of days only.
+    Each day is spread over like_stats_shards rows, summed here.
 
     :param date_from: datetime.date: The start date for the analytics data.
     :param date_to: datetime.date: The end date for the analytics data.
@@ -40,15 +206,13 @@ async def get_analytics_by_days(date_from: datetime.date, date_to: datetime.date
 
     """
     print("Getting analytics")
-    datetime_from = datetime.combine(date_from, datetime.min.time())
-    datetime_to = datetime.combine(date_to, datetime.max.time())
+    total = func.sum(LikeDailyStats.like_count)
     query = (
-        select(
-            func.date(association_table.c.created_at).label("date"),
-            func.count().label("count")
-        )
-        .where(association_table.c.created_at.between(datetime_from, datetime_to))
-        .group_by(func.date(association_table.c.created_at))
+        select(LikeDailyStats.day, total)
+        .where(LikeDailyStats.day.between(date_from, date_to))
+        .group_by(LikeDailyStats.day)
+        .having(total > 0)
+        .order_by(LikeDailyStats.day)
     )
 
     result = await session.execute(query)
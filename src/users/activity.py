@@ -0,0 +1,149 @@
+import asyncio
+import logging
+import uuid
+from datetime import datetime
+
+from sqlalchemy import DateTime, cast, column, func, update, values, select
+from sqlalchemy.dialects.postgresql import UUID
+
+from src.database.database import async_session_maker
+from src.database.models import User
+from src.users.principal import resolve_principal
+
+logger = logging.getLogger(__name__)
+
+
+class ActivityTracker:
+    """
+    Buffers last_login and last_request_time touches in memory and writes them in bulk.
+
+    Recording a touch is a single dict write; flush() persists every pending
+    touch with one UPDATE ... FROM (VALUES ...) statement.
+    """
+
+    def __init__(self):
+        self._logins: dict[uuid.UUID, datetime] = {}
+        self._requests: dict[uuid.UUID, datetime] = {}
+
+    def touch_login(self, user_id: uuid.UUID) -> None:
+        self._logins[user_id] = datetime.now()
+
+    def touch_request(self, user_id: uuid.UUID) -> None:
+        self._requests[user_id] = datetime.now()
+
+    def pending(self, user_id: uuid.UUID) -> tuple[datetime | None, datetime | None]:
+        """
+        Get the touches of a user that are not flushed yet.
+
+        :param user_id: uuid.UUID: The ID of the user.
+        :return: tuple[datetime | None, datetime | None]: The pending last login and last request times.
+        """
+        return self._logins.get(user_id), self._requests.get(user_id)
+
+    async def flush(self) -> int:
+        """
+        Write all pending touches to the user table.
+
+        If the write fails the touches are put back, unless newer ones were recorded meanwhile.
+
+        :return: int: The number of users updated.
+        """
+        logins, self._logins = self._logins, {}
+        requests, self._requests = self._requests, {}
+        user_ids = logins.keys() | requests.keys()
+        if not user_ids:
+            return 0
+
+        activity = values(
+            column("id", UUID(as_uuid=True)),
+            column("last_login", DateTime),
+            column("last_request_time", DateTime),
+            name="activity",
+        ).data([(user_id, logins.get(user_id), requests.get(user_id)) for user_id in sorted(user_ids)])
+        stmt = (
+            update(User)
+            .where(User.id == activity.c.id)
+            .values(
+                # a VALUES column holding only NULLs is typed as text, hence the casts
+                last_login=func.coalesce(cast(activity.c.last_login, DateTime), User.last_login),
+                last_request_time=func.coalesce(cast(activity.c.last_request_time, DateTime), User.last_request_time),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        # Lock the users in ID order first, the UPDATE ... FROM alone may visit them in any order.
+        lock = select(User.id).where(User.id.in_(sorted(user_ids))).order_by(User.id).with_for_update(key_share=True)
+        try:
+            async with async_session_maker() as session:
+                await session.execute(lock)
+                await session.execute(stmt)
+                await session.commit()
+        except Exception:
+            self._logins = {**logins, **self._logins}
+            self._requests = {**requests, **self._requests}
+            raise
+        return len(user_ids)
+
+    async def run(self, interval: float) -> None:
+        """
+        Flush pending touches every `interval` seconds until cancelled, then flush one last time.
+
+        :param interval: float: The number of seconds between flushes.
+        :return: None.
+        """
+        try:
+            while True:
+                await asyncio.sleep(interval)
+                try:
+                    await self.flush()
+                except Exception:
+                    logger.exception("Failed to flush user activity")
+        except asyncio.CancelledError:
+            await self.flush()
+            raise
+
+
+activity_tracker = ActivityTracker()
+
+
+class ActivityMiddleware:
+    """
+    ASGI middleware recording a request touch for every call carrying a valid bearer token.
+    """
+
+    def __init__(self, app, strategy):
+        self.app = app
+        self.strategy = strategy
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"authorization":
+                    scheme, _, token = value.decode("latin-1").partition(" ")
+                    if scheme.lower() == "bearer":
+                        principal = resolve_principal(token, self.strategy)
+                        if principal is not None and principal.is_active:
+                            activity_tracker.touch_request(principal.id)
+                    break
+        await self.app(scope, receive, send)
+
+
+async def read_activity(user_id: uuid.UUID, session) -> dict | None:
+    """
+    Read the tracked activity of a user, including touches that are not flushed yet.
+
+    :param user_id: uuid.UUID: The ID of the user.
+    :param session: AsyncSession: The database session.
+    :return: dict | None: The last login and last request times, or None if the user does not exist.
+    """
+    row = (
+        await session.execute(select(User.last_login, User.last_request_time).where(User.id == user_id))
+    ).one_or_none()
+    if row is None:
+        return None
+
+    pending_login, pending_request = activity_tracker.pending(user_id)
+    return {
+        "user_id": user_id,
+        "last_login": max(filter(None, (row.last_login, pending_login)), default=None),
+        "last_request_time": max(filter(None, (row.last_request_time, pending_request)), default=None),
+    }
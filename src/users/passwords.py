@@ -0,0 +1,64 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib import pwd
+from passlib.context import CryptContext
+
+from src.config import settings
+
+
+def build_crypt_context() -> CryptContext:
+    """
+    Build the passlib context from the PASSWORD_* settings.
+
+    New passwords are hashed with the first scheme of password_schemes. Hashes of
+    the other schemes, or with another cost than the configured one, still verify
+    but are flagged for an update, so they are rehashed on the next login.
+
+    :return: CryptContext: The password hashing context.
+    """
+    return CryptContext(
+        schemes=settings.password_schemes,
+        deprecated="auto",
+        bcrypt__rounds=settings.password_bcrypt_rounds,
+        bcrypt__min_rounds=settings.password_bcrypt_rounds,
+        bcrypt__max_rounds=settings.password_bcrypt_rounds,
+        argon2__time_cost=settings.password_argon2_time_cost,
+        argon2__memory_cost=settings.password_argon2_memory_cost,
+        argon2__parallelism=settings.password_argon2_parallelism,
+    )
+
+
+class AsyncPasswordHelper:
+    """
+    Hashes and verifies passwords in a bounded thread pool instead of the event loop.
+
+    bcrypt and argon2 release the GIL while hashing, so the pool also spreads a
+    burst of logins over several cores. At most `max_workers` hashes run at once,
+    the rest wait in the executor queue without blocking other requests.
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int):
+        self.context = context
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.context.hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+        """
+        Verify a password and rehash it if its hash uses a deprecated scheme or cost.
+
+        :param plain_password: str: The password to check.
+        :param hashed_password: str: The stored hash.
+        :return: tuple[bool, str | None]: Whether the password matches, and the new hash to store if any.
+        """
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, self.context.verify_and_update, plain_password, hashed_password
+        )
+
+    def generate(self) -> str:
+        return pwd.genword()
+
+
+password_helper = AsyncPasswordHelper(build_crypt_context(), max_workers=settings.password_hash_workers)
@@ -0,0 +1,158 @@
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import jwt
+from fastapi_users import exceptions
+from fastapi_users.authentication import JWTStrategy
+from fastapi_users.jwt import decode_jwt, generate_jwt
+
+from src.config import settings
+
+
+@dataclass(frozen=True, slots=True)
+class Principal:
+    """
+    Lightweight authenticated user built from signed token claims instead of the user row.
+    """
+    id: uuid.UUID
+    is_active: bool
+    username: str
+    is_superuser: bool = False
+
+
+class PrincipalCache:
+    """
+    Short-lived cache of decoded tokens plus an in-process revocation list.
+
+    Revocations are kept until every token they can affect has expired. They are
+    local to the worker process, so tokens should be short-lived in stateless mode.
+    """
+
+    def __init__(self, ttl: float, max_size: int, token_lifetime: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.token_lifetime = token_lifetime
+        self._entries: OrderedDict[str, tuple[float, int, Principal]] = OrderedDict()
+        self._revoked_users: dict[uuid.UUID, int] = {}
+        self._revoked_tokens: dict[str, float] = {}
+
+    def get(self, token: str) -> Principal | None:
+        entry = self._entries.get(token)
+        if entry is None:
+            return None
+        cached_until, issued_at, principal = entry
+        if cached_until <= time.monotonic() or self.is_revoked(token, principal.id, issued_at):
+            del self._entries[token]
+            return None
+        return principal
+
+    def put(self, token: str, principal: Principal, issued_at: int) -> None:
+        self._entries[token] = (time.monotonic() + self.ttl, issued_at, principal)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def is_revoked(self, token: str, user_id: uuid.UUID, issued_at: int) -> bool:
+        # iat has a one second resolution: a token issued in the second of the revocation
+        # is kept, so that the login following a password reset is not rejected.
+        revoked_at = self._revoked_users.get(user_id)
+        return token in self._revoked_tokens or (revoked_at is not None and issued_at < revoked_at)
+
+    def revoke_user(self, user_id: uuid.UUID) -> None:
+        """
+        Reject every token of a user issued before the current second, e.g. after deactivation or a password reset.
+        """
+        self._prune()
+        self._revoked_users[user_id] = int(time.time())
+
+    def revoke_token(self, token: str) -> None:
+        """
+        Reject a single token, e.g. on logout.
+        """
+        self._prune()
+        self._revoked_tokens[token] = time.time()
+        self._entries.pop(token, None)
+
+    def _prune(self) -> None:
+        horizon = time.time() - self.token_lifetime
+        self._revoked_users = {key: at for key, at in self._revoked_users.items() if at > horizon}
+        self._revoked_tokens = {key: at for key, at in self._revoked_tokens.items() if at > horizon}
+
+
+principal_cache = PrincipalCache(
+    ttl=settings.auth_principal_cache_ttl,
+    max_size=settings.auth_principal_cache_max_size,
+    token_lifetime=settings.jwt_lifetime_seconds,
+)
+
+
+class ClaimsJWTStrategy(JWTStrategy):
+    """
+    JWTStrategy whose tokens carry the claims needed to build a Principal.
+
+    Revoked tokens are rejected by read_token as well, so revocation also applies
+    to routes that still load the full user.
+    """
+
+    async def read_token(self, token, user_manager):
+        if token is None:
+            return None
+
+        try:
+            data = decode_jwt(token, self.decode_key, self.token_audience, algorithms=[self.algorithm])
+            user_id = user_manager.parse_id(data["sub"])
+        except (jwt.PyJWTError, KeyError, exceptions.InvalidID):
+            return None
+
+        if principal_cache.is_revoked(token, user_id, int(data.get("iat", 0))):
+            return None
+        try:
+            return await user_manager.get(user_id)
+        except exceptions.UserNotExists:
+            return None
+
+    async def write_token(self, user) -> str:
+        data = {
+            "sub": str(user.id),
+            "aud": self.token_audience,
+            "iat": int(time.time()),
+            "username": user.username,
+            "active": user.is_active,
+            "superuser": user.is_superuser,
+        }
+        return generate_jwt(data, self.encode_key, self.lifetime_seconds, algorithm=self.algorithm)
+
+    async def destroy_token(self, token: str, user) -> None:
+        principal_cache.revoke_token(token)
+
+
+def resolve_principal(token: str, strategy: JWTStrategy) -> Principal | None:
+    """
+    Build the principal of a bearer token without touching the database.
+
+    :param token: str: The encoded JWT.
+    :param strategy: JWTStrategy: The strategy holding the decode key, audience and algorithm.
+    :return: Principal | None: The principal, or None if the token is invalid, revoked or lacks claims.
+    """
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
+    try:
+        data = decode_jwt(token, strategy.decode_key, strategy.token_audience, algorithms=[strategy.algorithm])
+        principal = Principal(
+            id=uuid.UUID(data["sub"]),
+            is_active=data["active"],
+            username=data["username"],
+            is_superuser=data.get("superuser", False),
+        )
+        issued_at = int(data["iat"])
+    except (jwt.PyJWTError, KeyError, ValueError):
+        return None
+
+    if principal_cache.is_revoked(token, principal.id, issued_at):
+        return None
+    principal_cache.put(token, principal, issued_at)
+    return principal
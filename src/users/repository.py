@@ -0,0 +1,115 @@
+import uuid
+
+from sqlalchemy import select, delete, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.models import User, follows_table
+from src.posts.repository import TimelineQuery
+
+
+class UserQuery:
+    @staticmethod
+    async def exists(user_id: uuid.UUID, session: AsyncSession) -> bool:
+        """
+        Check that a user exists.
+
+        :param user_id: uuid.UUID: The ID of the user.
+        :param session: AsyncSession: The database session.
+        :return: bool: True if the user exists.
+        """
+        return await session.scalar(select(User.id).where(User.id == user_id)) is not None
+
+
+class FollowQuery:
+    @staticmethod
+    async def follow(follower_id: uuid.UUID, followee_id: uuid.UUID, session: AsyncSession) -> int | None:
+        """
+        Follow a user and backfill the timeline of the follower with their latest posts.
+
+        :param follower_id: uuid.UUID: The ID of the user following.
+        :param followee_id: uuid.UUID: The ID of the user to follow.
+        :param session: AsyncSession: The database session.
+
+        :return: int | None: The new number of followers, or None if the user is already followed.
+
+        """
+        stmt = (
+            pg_insert(follows_table)
+            .values(follower_id=follower_id, followee_id=followee_id)
+            .on_conflict_do_nothing(index_elements=["follower_id", "followee_id"])
+            .returning(follows_table.c.followee_id)
+        )
+        if (await session.execute(stmt)).first() is None:
+            await session.rollback()
+            return None
+
+        follower_count = await FollowQuery._add_followers(followee_id, 1, session)
+        await TimelineQuery.backfill(follower_id, followee_id, session)
+        await session.commit()
+        return follower_count
+
+    @staticmethod
+    async def unfollow(follower_id: uuid.UUID, followee_id: uuid.UUID, session: AsyncSession) -> int | None:
+        """
+        Unfollow a user and drop their posts from the timeline of the former follower.
+
+        :param follower_id: uuid.UUID: The ID of the user unfollowing.
+        :param followee_id: uuid.UUID: The ID of the user to unfollow.
+        :param session: AsyncSession: The database session.
+
+        :return: int | None: The new number of followers, or None if the user was not followed.
+
+        """
+        stmt = (
+            delete(follows_table)
+            .where(follows_table.c.follower_id == follower_id, follows_table.c.followee_id == followee_id)
+            .returning(follows_table.c.followee_id)
+        )
+        if (await session.execute(stmt)).first() is None:
+            await session.rollback()
+            return None
+
+        follower_count = await FollowQuery._add_followers(followee_id, -1, session)
+        await TimelineQuery.remove_posts_of(follower_id, followee_id, session)
+        await session.commit()
+        return follower_count
+
+    @staticmethod
+    async def release_follows_of(user: User, session: AsyncSession) -> None:
+        """
+        Decrement the follower counters of every user followed by a user that is about to be deleted.
+
+        The follows themselves are removed by the ON DELETE CASCADE foreign key, so this
+        must run in the same transaction as the user deletion.
+
+        :param user: User: The user that is going to be deleted.
+        :param session: AsyncSession: The database session.
+        :return: None.
+        """
+        followed = select(follows_table.c.followee_id).where(follows_table.c.follower_id == user.id)
+        stmt = (
+            update(User)
+            .where(User.id.in_(followed))
+            .values(follower_count=User.follower_count - 1)
+            .execution_options(synchronize_session=False)
+        )
+        await session.execute(stmt)
+
+    @staticmethod
+    async def _add_followers(user_id: uuid.UUID, delta: int, session: AsyncSession) -> int:
+        """
+        Shift the denormalized follower counter of a user.
+
+        :param user_id: uuid.UUID: The ID of the user.
+        :param delta: int: The number of followers to add, negative to remove.
+        :param session: AsyncSession: The database session.
+        :return: int: The new number of followers.
+        """
+        stmt = (
+            update(User)
+            .where(User.id == user_id)
+            .values(follower_count=User.follower_count + delta)
+            .returning(User.follower_count)
+            .execution_options(synchronize_session=False)
+        )
+        return await session.scalar(stmt)
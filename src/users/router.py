@@ -1,3 +1,95 @@
-from fastapi import APIRouter
+import uuid
 
-auth_router = APIRouter()
\ No newline at end of file
+from typing import List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import settings
+from src.database.database import get_async_session, get_read_session
+from src.posts.repository import PostQuery
+from src.posts.schemas import PostListItem
+from src.posts.utils import decode_cursor, encode_cursor, post_rows_response
+from src.users.activity import read_activity
+from src.users.principal import Principal
+from src.users.repository import FollowQuery, UserQuery
+from src.users.users import current_active_principal
+
+auth_router = APIRouter()
+
+users_router = APIRouter(prefix="/users", tags=["users"])
+
+
+@users_router.get("/{user_id}/activity")
+async def get_user_activity(
+        user_id: uuid.UUID,
+        user: Principal = Depends(current_active_principal),
+        session: AsyncSession = Depends(get_async_session),
+):
+    if user_id != user.id and not user.is_superuser:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="You can only see your own activity"
+        )
+    activity = await read_activity(user_id, session)
+    if activity is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found!"
+        )
+    return activity
+
+
+@users_router.post("/{user_id}/follow", status_code=status.HTTP_200_OK)
+async def follow_user(
+        user_id: uuid.UUID,
+        user: Principal = Depends(current_active_principal),
+        session: AsyncSession = Depends(get_async_session),
+):
+    if user_id == user.id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="You cannot follow yourself"
+        )
+    if not await UserQuery.exists(user_id, session):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found!"
+        )
+    follower_count = await FollowQuery.follow(user.id, user_id, session)
+    if follower_count is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="You already follow this user"
+        )
+    return {"message": "User followed", "followers": follower_count}
+
+
+@users_router.post("/{user_id}/unfollow", status_code=status.HTTP_200_OK)
+async def unfollow_user(
+        user_id: uuid.UUID,
+        user: Principal = Depends(current_active_principal),
+        session: AsyncSession = Depends(get_async_session),
+):
+    follower_count = await FollowQuery.unfollow(user.id, user_id, session)
+    if follower_count is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="You do not follow this user"
+        )
+    return {"message": "User unfollowed", "followers": follower_count}
+
+
+@users_router.get("/{user_id}/posts", response_model=List[PostListItem])
+async def get_user_posts(
+        request: Request,
+        user_id: uuid.UUID,
+        limit: int = Query(default=settings.posts_page_size, ge=1, le=settings.posts_max_page_size),
+        cursor: str | None = None,
+        user: Principal = Depends(current_active_principal),
+        session: AsyncSession = Depends(get_read_session),
+):
+    position = decode_cursor(cursor) if cursor else None
+    posts, next_position = await PostQuery.read_by_owner(
+        user_id, session, limit=limit, cursor=position, viewer_id=user.id
+    )
+    if not posts and position is None and not await UserQuery.exists(user_id, session):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="User not found!"
+        )
+    headers = {"X-Next-Cursor": encode_cursor(*next_position)} if next_position is not None else None
+    return post_rows_response(posts, headers=headers, request=request)
@@ -1,17 +1,25 @@
 import uuid
-from typing import Optional
+from typing import Optional, Any, Dict
 
-from fastapi import Depends, Request
-from fastapi_users import BaseUserManager, FastAPIUsers, UUIDIDMixin
+from fastapi import Depends, Request, HTTPException, status
+from fastapi.security import OAuth2PasswordRequestForm
+from fastapi_users import BaseUserManager, FastAPIUsers, UUIDIDMixin, exceptions, schemas
+from fastapi_users.password import PasswordHelper
 from fastapi_users.authentication import (
     AuthenticationBackend,
     BearerTransport,
     JWTStrategy,
 )
-from fastapi_users.db import SQLAlchemyUserDatabase
+from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
 from src.config import settings
 from src.database.database import get_user_db
 from src.database.models import User
+from src.posts.cache import post_cache
+from src.posts.repository import PostQuery
+from src.users.repository import FollowQuery
+from src.users.activity import activity_tracker
+from src.users.passwords import password_helper
+from src.users.principal import Principal, ClaimsJWTStrategy, principal_cache, resolve_principal
 
 SECRET = settings.secret_key
 
@@ -20,11 +28,88 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
     reset_password_token_secret = SECRET
     verification_token_secret = SECRET
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # The posts whose likes change with a user deletion, from on_before_delete to on_after_delete.
+        self._affected_post_ids: list[int] = []
+
+    async def authenticate(self, credentials: OAuth2PasswordRequestForm) -> Optional[User]:
+        """
+        Authenticate a user by email and password, hashing in the password thread pool.
+
+        A hash with a deprecated scheme or cost is replaced on success.
+
+        :param credentials: OAuth2PasswordRequestForm: The login form.
+        :return: Optional[User]: The user, or None if the credentials are invalid.
+        """
+        try:
+            user = await self.get_by_email(credentials.username)
+        except exceptions.UserNotExists:
+            # Hash anyway, so unknown emails take as long as wrong passwords.
+            await password_helper.hash(credentials.password)
+            return None
+
+        verified, updated_password_hash = await password_helper.verify_and_update(
+            credentials.password, user.hashed_password
+        )
+        if not verified:
+            return None
+        if updated_password_hash is not None:
+            await self.user_db.update(user, {"hashed_password": updated_password_hash})
+        return user
+
+    async def create(
+            self, user_create: schemas.UC, safe: bool = False, request: Optional[Request] = None
+    ) -> User:
+        """
+        Create a user, hashing the password in the password thread pool.
+
+        :param user_create: schemas.UC: The registration data.
+        :param safe: bool: Ignore is_superuser and is_verified from the registration data.
+        :param request: Optional[Request]: The request that triggered the registration.
+        :return: User: The new user.
+        """
+        await self.validate_password(user_create.password, user_create)
+        if await self.user_db.get_by_email(user_create.email) is not None:
+            raise exceptions.UserAlreadyExists()
+
+        user_dict = user_create.create_update_dict() if safe else user_create.create_update_dict_superuser()
+        user_dict["hashed_password"] = await password_helper.hash(user_dict.pop("password"))
+        created_user = await self.user_db.create(user_dict)
+        await self.on_after_register(created_user, request)
+        return created_user
+
+    async def _update(self, user: User, update_dict: Dict[str, Any]) -> User:
+        # BaseUserManager._update would hash a new password on the event loop,
+        # pass it the hash instead, which it stores as is.
+        password = update_dict.get("password")
+        if password is not None:
+            await self.validate_password(password, user)
+            update_dict = {key: value for key, value in update_dict.items() if key != "password"}
+            update_dict["hashed_password"] = await password_helper.hash(password)
+        return await super()._update(user, update_dict)
+
     async def on_after_register(self, user: User, request: Optional[Request] = None):
         print(f"User {user.id} has registered!.")
 
     async def on_after_login(self, user: User, request: Optional[Request] = None, *args, **kwargs):
         print(f"User {user.id} logged in.")
+        activity_tracker.touch_login(user.id)
+
+    async def on_before_delete(self, user: User, request: Optional[Request] = None):
+        self._affected_post_ids = await PostQuery.release_likes_of(user, self.user_db.session)
+        await FollowQuery.release_follows_of(user, self.user_db.session)
+
+    async def on_after_delete(self, user: User, request: Optional[Request] = None):
+        principal_cache.revoke_user(user.id)
+        await post_cache.invalidate(*self._affected_post_ids)
+
+    async def on_after_update(self, user: User, update_dict: dict, request: Optional[Request] = None):
+        if "password" in update_dict or update_dict.get("is_active") is False:
+            principal_cache.revoke_user(user.id)
+
+    async def on_after_reset_password(self, user: User, request: Optional[Request] = None):
+        principal_cache.revoke_user(user.id)
 
     async def on_after_forgot_password(
             self, user: User, token: str, request: Optional[Request] = None
@@ -38,14 +123,14 @@ class UserManager(UUIDIDMixin, BaseUserManager[User, uuid.UUID]):
 
 
 async def get_user_manager(user_db: SQLAlchemyUserDatabase = Depends(get_user_db)):
-    yield UserManager(user_db)
+    yield UserManager(user_db, password_helper=PasswordHelper(password_helper.context))
 
 
 bearer_transport = BearerTransport(tokenUrl="auth/jwt/login")
 
 
 def get_jwt_strategy() -> JWTStrategy:
-    return JWTStrategy(secret=SECRET, lifetime_seconds=3600)
+    return ClaimsJWTStrategy(secret=SECRET, lifetime_seconds=settings.jwt_lifetime_seconds)
 
 
 auth_backend = AuthenticationBackend(
@@ -57,3 +142,19 @@ auth_backend = AuthenticationBackend(
 fastapi_users = FastAPIUsers[User, uuid.UUID](get_user_manager, [auth_backend])
 
 current_active_user = fastapi_users.current_user(active=True)
+
+
+async def current_active_principal_from_token(token: Optional[str] = Depends(bearer_transport.scheme)) -> Principal:
+    """
+    Resolve the caller from the bearer token claims only, without loading the user row.
+
+    :param token: Optional[str]: The bearer token of the request.
+    :return: Principal: The active principal of the token.
+    """
+    principal = resolve_principal(token, get_jwt_strategy()) if token else None
+    if principal is None or not principal.is_active:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Unauthorized")
+    return principal
+
+
+current_active_principal = current_active_principal_from_token if settings.auth_stateless else current_active_user
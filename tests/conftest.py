@@ -0,0 +1,13 @@
+import os
+
+# src.config requires the database and JWT settings, the tests never connect.
+for name, value in {
+    "POSTGRES_DB": "test",
+    "POSTGRES_USER": "test",
+    "POSTGRES_PASSWORD": "test",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_HOST": "localhost",
+    "SECRET_KEY": "test",
+    "ALGORITHM": "HS256",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,177 @@
+import asyncio
+
+import pytest
+
+from src.middleware.admission import ADMISSION_RULES, AdmissionController, AdmissionGroup, AdmissionMiddleware
+
+
+def make_controller(max_concurrency=2, read_limit=2, write_limit=2, queue_size=10, queue_timeout=1.0, aging=10.0):
+    return AdmissionController(
+        max_concurrency=max_concurrency,
+        groups=[
+            AdmissionGroup("reads", read_limit, priority=0),
+            AdmissionGroup("writes", write_limit, priority=1),
+        ],
+        queue_size=queue_size,
+        queue_timeout=queue_timeout,
+        aging=aging,
+    )
+
+
+def test_release_hands_the_slot_over_to_a_waiter():
+    async def scenario():
+        controller = make_controller(max_concurrency=1)
+        assert await controller.acquire("reads")
+        waiter = asyncio.create_task(controller.acquire("reads"))
+        await asyncio.sleep(0)
+        assert controller.stats()["queued"] == 1
+
+        controller.release("reads")
+        assert await waiter
+        assert controller.stats() == {"active": 1, "max_concurrency": 1, "queued": 0}
+        controller.release("reads")
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiters_are_served_by_priority():
+    async def scenario():
+        controller = make_controller(max_concurrency=1)
+        assert await controller.acquire("writes")
+        write = asyncio.create_task(controller.acquire("writes"))
+        await asyncio.sleep(0)
+        read = asyncio.create_task(controller.acquire("reads"))
+        await asyncio.sleep(0)
+
+        controller.release("writes")
+        assert await read
+        assert not write.done()
+        controller.release("reads")
+        assert await write
+        controller.release("writes")
+
+    asyncio.run(scenario())
+
+
+def test_aged_waiters_get_ahead_of_higher_priority_ones():
+    async def scenario():
+        controller = make_controller(max_concurrency=1, aging=0.01)
+        assert await controller.acquire("writes")
+        write = asyncio.create_task(controller.acquire("writes"))
+        await asyncio.sleep(0.05)
+        read = asyncio.create_task(controller.acquire("reads"))
+        await asyncio.sleep(0)
+
+        controller.release("writes")
+        assert await write
+        assert not read.done()
+        controller.release("writes")
+        assert await read
+        controller.release("reads")
+
+    asyncio.run(scenario())
+
+
+def test_group_limit_leaves_room_for_other_groups():
+    async def scenario():
+        controller = make_controller(max_concurrency=3, read_limit=2)
+        assert await controller.acquire("reads")
+        assert await controller.acquire("reads")
+        read = asyncio.create_task(controller.acquire("reads"))
+        await asyncio.sleep(0)
+        assert not read.done()
+        assert await controller.acquire("writes")
+        read.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await read
+
+    asyncio.run(scenario())
+
+
+def test_wait_times_out():
+    async def scenario():
+        controller = make_controller(max_concurrency=1, queue_timeout=0.01)
+        assert await controller.acquire("reads")
+        assert not await controller.acquire("reads")
+        assert controller.group_stats()["reads"]["timed_out"] == 1
+        assert controller.stats()["queued"] == 0
+        assert controller.active == 1
+
+    asyncio.run(scenario())
+
+
+def test_full_queue_rejects():
+    async def scenario():
+        controller = make_controller(max_concurrency=1, queue_size=1)
+        assert await controller.acquire("reads")
+        waiter = asyncio.create_task(controller.acquire("reads"))
+        await asyncio.sleep(0)
+        assert not await controller.acquire("reads")
+        assert controller.group_stats()["reads"]["rejected"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    async def scenario():
+        controller = make_controller(max_concurrency=1)
+        assert await controller.acquire("reads")
+        waiter = asyncio.create_task(controller.acquire("reads"))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        assert controller.stats()["queued"] == 0
+
+        controller.release("reads")
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiter_cancelled_after_the_handover_gives_the_slot_back():
+    async def scenario():
+        controller = make_controller(max_concurrency=1)
+        assert await controller.acquire("reads")
+        first = asyncio.create_task(controller.acquire("reads"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(controller.acquire("writes"))
+        await asyncio.sleep(0)
+
+        # The slot goes to the first waiter, which is cancelled before it resumes. Depending on the
+        # Python version the cancellation wins, or the slot is returned and released by the caller.
+        controller.release("reads")
+        first.cancel()
+        (admitted,) = await asyncio.gather(first, return_exceptions=True)
+        if admitted is True:
+            controller.release("reads")
+        else:
+            assert isinstance(admitted, asyncio.CancelledError)
+        assert await second
+        assert controller.group_stats()["reads"]["active"] == 0
+        controller.release("writes")
+        assert controller.active == 0
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize(
+    "method, path, group",
+    [
+        ("GET", "/api/post/analytics", "analytics"),
+        ("GET", "/api/users/me/activity", "analytics"),
+        ("GET", "/api/post/1", "reads"),
+        ("GET", "/authenticated-route", "reads"),
+        ("POST", "/api/post/1/like", "writes"),
+        ("POST", "/auth/jwt/login", "writes"),
+        ("GET", "/api/healthchecker", None),
+        ("GET", "/metrics", None),
+    ],
+)
+def test_rules(method, path, group):
+    middleware = AdmissionMiddleware(None, make_controller(), ADMISSION_RULES, retry_after=1)
+    assert middleware.group_of({"type": "http", "method": method, "path": path}) == group
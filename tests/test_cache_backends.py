@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+
+from src.cache.backends import CacheBackend, InMemoryCache, RedisCache
+
+
+class DownClient:
+    async def get(self, key):
+        raise ConnectionError("Connection refused")
+
+    async def set(self, key, value, px):
+        raise TimeoutError("Timeout writing to socket")
+
+    async def delete(self, key):
+        raise ConnectionError("Connection refused")
+
+
+def test_backend_is_abstract():
+    with pytest.raises(TypeError):
+        CacheBackend()
+
+
+def test_in_memory_cache_evicts_least_recently_used():
+    async def scenario():
+        cache = InMemoryCache(max_size=2)
+        await cache.set("a", b"1", ttl=60)
+        await cache.set("b", b"2", ttl=60)
+        assert await cache.get("a") == b"1"
+        await cache.set("c", b"3", ttl=60)
+        assert await cache.get("b") is None
+        assert await cache.get("a") == b"1"
+        assert cache.stats()["evictions"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_unreachable_redis_falls_through():
+    async def scenario():
+        cache = RedisCache(DownClient(), prefix="test:")
+        assert await cache.get("post:1") is None
+        await cache.set("post:1", b"{}", ttl=60)
+        await cache.delete("post:1")
+        assert cache.stats() == {"errors": 3}
+
+    asyncio.run(scenario())
+
+
+class FakeRedis:
+    """
+    In-memory stand-in for the redis-py asyncio client, with millisecond expiry.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.entries = {}
+
+    async def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None or entry[0] <= self.now:
+            return None
+        return entry[1]
+
+    async def set(self, key, value, px):
+        self.entries[key] = (self.now + px / 1000, value)
+
+    async def delete(self, key):
+        self.entries.pop(key, None)
+
+
+def test_redis_cache_round_trip():
+    async def scenario():
+        client = FakeRedis()
+        cache = RedisCache(client, prefix="test:")
+        await cache.set("post:1", b"{}", ttl=60)
+        assert list(client.entries) == ["test:post:1"]
+        assert await cache.get("post:1") == b"{}"
+        assert await cache.get("post:2") is None
+
+        client.now = 61
+        assert await cache.get("post:1") is None
+
+        await cache.set("post:1", b"{}", ttl=60)
+        await cache.delete("post:1")
+        assert await cache.get("post:1") is None
+        assert cache.stats() == {"errors": 0}
+
+    asyncio.run(scenario())
@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from src.middleware.cache_control import PRIVATE_POLICY, CacheControlMiddleware
+
+POLICIES = {"/api/post/{post_id}": "public, max-age=30"}
+
+
+class Route:
+    path = "/api/post/{post_id}"
+
+
+def call(status: int, authorization: bool = False, route=Route()) -> str | None:
+    async def app(scope, receive, send):
+        scope["route"] = route
+        await send({"type": "http.response.start", "status": status, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    headers = [(b"authorization", b"Bearer token")] if authorization else []
+    scope = {"type": "http", "method": "GET", "path": "/api/post/1", "headers": headers}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(CacheControlMiddleware(app, POLICIES)(scope, receive, send))
+    return dict(messages[0]["headers"]).get(b"cache-control", b"").decode() or None
+
+
+@pytest.mark.parametrize("status", [200, 304])
+def test_route_policy_on_success(status):
+    assert call(status) == "public, max-age=30"
+    assert call(status, authorization=True) == "public, max-age=30"
+
+
+@pytest.mark.parametrize("status", [404, 410])
+def test_errors_are_never_public(status):
+    assert call(status) == PRIVATE_POLICY
+
+
+def test_authenticated_responses_of_other_routes_are_private():
+    assert call(200, authorization=True, route=None) == PRIVATE_POLICY
+    assert call(200, route=None) is None
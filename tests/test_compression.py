@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from src.middleware.compression import CompressionMiddleware, accepted_encodings
+
+BODY = b'{"text": "' + b"x" * 2000 + b'"}'
+
+
+def make_app(etag: str):
+    async def app(scope, receive, send):
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(BODY)).encode()),
+                (b"etag", etag.encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": BODY})
+
+    return app
+
+
+def call(app, accept_encoding: str) -> dict[str, str]:
+    middleware = CompressionMiddleware(app, min_size=500, gzip_level=6, brotli_quality=4, media_types=["application/json"])
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"accept-encoding", accept_encoding.encode())]}
+    messages = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(middleware(scope, receive, send))
+    return {name.decode(): value.decode() for name, value in messages[0]["headers"]}
+
+
+def test_accepted_encodings():
+    assert accepted_encodings("gzip;q=1.0, br;q=0, identity") == {"gzip", "identity"}
+
+
+@pytest.mark.parametrize("etag, expected", [('"v1"', 'W/"v1"'), ('W/"v1"', 'W/"v1"')])
+def test_compressed_response_has_a_weak_etag(etag, expected):
+    headers = call(make_app(etag), "gzip")
+    assert headers["content-encoding"] == "gzip"
+    assert headers["etag"] == expected
+
+
+def test_uncompressed_response_keeps_its_etag():
+    headers = call(make_app('"v1"'), "identity")
+    assert "content-encoding" not in headers
+    assert headers["etag"] == '"v1"'
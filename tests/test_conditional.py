@@ -0,0 +1,60 @@
+import uuid
+from datetime import datetime
+
+import pytest
+from starlette.requests import Request
+
+from src.posts.utils import post_response, version_etag
+
+POST = {
+    "id": 1,
+    "owner_id": str(uuid.uuid4()),
+    "text": "Hello",
+    "created_at": datetime(2024, 1, 1),
+    "updated_at": None,
+    "like_count": 0,
+    "version_at": datetime(2024, 1, 2, 12, 0, 0, 500_000),
+}
+
+
+def make_request(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/api/post/1", "headers": raw})
+
+
+def test_matching_etag_is_not_modified():
+    etag = version_etag([POST])
+    response = post_response(POST, make_request(if_none_match=etag.removeprefix("W/")))
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+def test_new_like_changes_the_etag():
+    etag = version_etag([POST])
+    response = post_response({**POST, "like_count": 1}, make_request(if_none_match=etag))
+    assert response.status_code == 200
+    assert b"version_at" not in response.body
+
+
+def test_last_modified_is_the_version():
+    response = post_response(POST, make_request())
+    assert response.headers["last-modified"] == "Tue, 02 Jan 2024 12:00:00 GMT"
+
+
+@pytest.mark.parametrize(
+    ("since", "status_code"),
+    [
+        ("Tue, 02 Jan 2024 12:00:00 GMT", 304),
+        ("Wed, 03 Jan 2024 00:00:00 GMT", 304),
+        ("Tue, 02 Jan 2024 11:59:59 GMT", 200),
+        ("not a date", 200),
+    ],
+)
+def test_if_modified_since(since, status_code):
+    assert post_response(POST, make_request(if_modified_since=since)).status_code == status_code
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    # A like bumps version_at, but a client with an old ETag must get the new like count anyway.
+    request = make_request(if_none_match='"old"', if_modified_since="Wed, 03 Jan 2024 00:00:00 GMT")
+    assert post_response(POST, request).status_code == 200
@@ -0,0 +1,191 @@
+import asyncio
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+
+from src.posts import like_queue as like_queue_module
+from src.posts.like_queue import LIKE, UNLIKE, LikeQueue
+
+POST_ID = 1
+USER_ID = uuid.uuid4()
+PAIR = (USER_ID, POST_ID)
+
+
+@asynccontextmanager
+async def fake_session_maker():
+    yield None
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """
+    Replace the database with a set of existing likes, applied like apply_like_batch does.
+    """
+    existing = set()
+
+    async def apply_like_batch(likes, unlikes, session):
+        liked = {pair for pair in likes if pair not in existing}
+        unliked = {pair for pair in unlikes if pair in existing}
+        existing.update(liked)
+        existing.difference_update(unliked)
+        post_ids = {post_id for _, post_id in likes} | {post_id for _, post_id in unlikes}
+        counts = {post_id: sum(1 for _, liked_post in existing if liked_post == post_id) for post_id in post_ids}
+        return liked, unliked, counts
+
+    monkeypatch.setattr(like_queue_module, "async_session_maker", fake_session_maker)
+    monkeypatch.setattr(like_queue_module.PostQuery, "apply_like_batch", apply_like_batch)
+    return existing
+
+
+def run_batch(actions: list[str]) -> list[int | None]:
+    async def submit_and_flush():
+        queue = LikeQueue(interval=1.0, batch_size=100, max_depth=100, wait_for_flush=True, max_retries=0)
+        futures = [queue.submit(action, USER_ID, POST_ID) for action in actions]
+        await queue.flush()
+        return [future.result() for future in futures]
+
+    return asyncio.run(submit_and_flush())
+
+
+@pytest.mark.parametrize(
+    ("liked_before", "actions", "expected", "liked_after"),
+    [
+        (False, [LIKE], [1], True),
+        (True, [LIKE], [None], True),
+        (False, [UNLIKE], [None], False),
+        (True, [UNLIKE], [0], False),
+        (False, [LIKE, UNLIKE], [0, 0], False),
+        (True, [UNLIKE, LIKE], [1, 1], True),
+        (False, [LIKE, LIKE], [1, None], True),
+        (True, [UNLIKE, UNLIKE], [0, None], False),
+        (True, [LIKE, UNLIKE], [None, 0], False),
+        (False, [UNLIKE, LIKE], [None, 1], True),
+        (False, [LIKE, UNLIKE, LIKE], [1, 1, 1], True),
+        (True, [UNLIKE, LIKE, LIKE, UNLIKE], [0, 0, None, 0], False),
+    ],
+)
+def test_flush_resolves_each_operation_in_order(database, liked_before, actions, expected, liked_after):
+    if liked_before:
+        database.add(PAIR)
+
+    assert run_batch(actions) == expected
+    assert (PAIR in database) == liked_after
+
+
+def test_failed_flush_fails_every_operation(monkeypatch):
+    async def apply_like_batch(likes, unlikes, session):
+        raise RuntimeError("database is down")
+
+    monkeypatch.setattr(like_queue_module, "async_session_maker", fake_session_maker)
+    monkeypatch.setattr(like_queue_module.PostQuery, "apply_like_batch", apply_like_batch)
+
+    async def submit_and_flush():
+        queue = LikeQueue(interval=1.0, batch_size=100, max_depth=100, wait_for_flush=True, max_retries=0)
+        future = queue.submit(LIKE, USER_ID, POST_ID)
+        with pytest.raises(RuntimeError):
+            await queue.flush()
+        return future
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(submit_and_flush()).result()
+
+
+def test_flush_applies_at_most_batch_size_operations(database):
+    async def submit_and_flush():
+        queue = LikeQueue(interval=1.0, batch_size=2, max_depth=100, wait_for_flush=True, max_retries=0)
+        futures = [queue.submit(LIKE, uuid.uuid4(), POST_ID) for _ in range(5)]
+        flushed = [await queue.flush() for _ in range(4)]
+        return flushed, [future.result() for future in futures]
+
+    flushed, results = asyncio.run(submit_and_flush())
+    assert flushed == [2, 2, 1, 0]
+    assert results == [2, 2, 4, 4, 5]
+
+
+@pytest.fixture
+def flaky_database(monkeypatch, database):
+    """
+    Make the next `failures[0]` batches fail before they reach the database.
+    """
+    failures = [0]
+    apply_like_batch = like_queue_module.PostQuery.apply_like_batch
+
+    async def flaky_apply_like_batch(likes, unlikes, session):
+        if failures[0] > 0:
+            failures[0] -= 1
+            raise ConnectionError("database is down")
+        return await apply_like_batch(likes, unlikes, session)
+
+    monkeypatch.setattr(like_queue_module.PostQuery, "apply_like_batch", flaky_apply_like_batch)
+    return failures
+
+
+def test_failed_batch_is_retried(database, flaky_database):
+    flaky_database[0] = 2
+
+    async def submit_and_flush():
+        queue = LikeQueue(interval=1.0, batch_size=100, max_depth=100, wait_for_flush=False, max_retries=2)
+        queue.submit(LIKE, USER_ID, POST_ID)
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await queue.flush()
+            assert queue.depth == 1
+        assert await queue.flush() == 1
+        return queue.stats()
+
+    stats = asyncio.run(submit_and_flush())
+    assert PAIR in database
+    assert (stats["retried"], stats["failed"], stats["depth"]) == (2, 0, 0)
+
+
+def test_batch_out_of_retries_is_dropped(database, flaky_database):
+    flaky_database[0] = 2
+
+    async def submit_and_flush():
+        queue = LikeQueue(interval=1.0, batch_size=100, max_depth=100, wait_for_flush=True, max_retries=1)
+        future = queue.submit(LIKE, USER_ID, POST_ID)
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await queue.flush()
+        return queue, future
+
+    queue, future = asyncio.run(submit_and_flush())
+    assert isinstance(future.exception(), ConnectionError)
+    assert (queue.depth, queue.failed) == (0, 1)
+    assert PAIR not in database
+
+
+def test_shutdown_drains_the_queue_despite_errors(database, flaky_database):
+    flaky_database[0] = 100
+
+    async def run_and_cancel():
+        queue = LikeQueue(interval=60.0, batch_size=2, max_depth=100, wait_for_flush=False, max_retries=3)
+        for _ in range(3):
+            queue.submit(LIKE, uuid.uuid4(), POST_ID)
+        task = asyncio.create_task(queue.run())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return queue
+
+    queue = asyncio.run(run_and_cancel())
+    assert (queue.depth, queue.failed) == (0, 3)
+
+
+def test_shutdown_flushes_the_queue(database):
+    async def run_and_cancel():
+        queue = LikeQueue(interval=60.0, batch_size=2, max_depth=100, wait_for_flush=False, max_retries=3)
+        for _ in range(3):
+            queue.submit(LIKE, uuid.uuid4(), POST_ID)
+        task = asyncio.create_task(queue.run())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return queue
+
+    queue = asyncio.run(run_and_cancel())
+    assert (queue.depth, queue.batches) == (0, 2)
+    assert len(database) == 3
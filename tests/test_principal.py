@@ -0,0 +1,26 @@
+import uuid
+
+from src.users import principal as principal_module
+from src.users.principal import PrincipalCache
+
+
+def test_revoke_user_keeps_tokens_issued_in_the_same_second(monkeypatch):
+    cache = PrincipalCache(ttl=30.0, max_size=10, token_lifetime=3600)
+    user_id = uuid.uuid4()
+    monkeypatch.setattr(principal_module.time, "time", lambda: 1_000.75)
+
+    cache.revoke_user(user_id)
+
+    assert cache.is_revoked("old", user_id, issued_at=999)
+    assert not cache.is_revoked("new", user_id, issued_at=1_000)
+    assert not cache.is_revoked("other", uuid.uuid4(), issued_at=999)
+
+
+def test_revoke_token_rejects_only_that_token():
+    cache = PrincipalCache(ttl=30.0, max_size=10, token_lifetime=3600)
+    user_id = uuid.uuid4()
+
+    cache.revoke_token("logged-out")
+
+    assert cache.is_revoked("logged-out", user_id, issued_at=0)
+    assert not cache.is_revoked("still-valid", user_id, issued_at=0)
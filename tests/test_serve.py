@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+import serve
+from src.config import Settings
+
+
+def test_several_workers_default_to_redis(monkeypatch):
+    # Set first so that monkeypatch restores the variable set by share_post_cache.
+    monkeypatch.setenv("POST_CACHE_BACKEND", "")
+    monkeypatch.delenv("POST_CACHE_BACKEND")
+    monkeypatch.setattr(serve, "settings", Settings(_env_file=None))
+    serve.share_post_cache(workers=4)
+    assert os.environ["POST_CACHE_BACKEND"] == "redis"
+
+
+def test_several_workers_refuse_memory(monkeypatch):
+    monkeypatch.setenv("POST_CACHE_BACKEND", "memory")
+    monkeypatch.setattr(serve, "settings", Settings(_env_file=None))
+    with pytest.raises(SystemExit):
+        serve.share_post_cache(workers=4)
+
+
+def test_single_worker_keeps_memory(monkeypatch):
+    monkeypatch.setenv("POST_CACHE_BACKEND", "memory")
+    monkeypatch.setattr(serve, "settings", Settings(_env_file=None))
+    serve.share_post_cache(workers=1)
+    assert os.environ["POST_CACHE_BACKEND"] == "memory"